@@ -1,72 +1,746 @@
+import argparse
+import calendar
+import hashlib
+import json
 import os
 import re
 import shutil
+import sqlite3
+import stat
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timezone
 
 # ===============================
 # University Project Commit Script (Python version)
 # ===============================
+#
+# Library use:  run(ReplayConfig(original_folder=..., trimmed_folder=..., ...))
+#               or the individual steps: scan() -> group() -> plan() -> apply()
+# CLI use:      python ArchiveReplayer.py --help
 
-# --- Configuration ---
-is_test = True   # <-- Set to False for live Git commits
-original_folder = r"E:\uni"
-trimmed_folder  = r"E:\uni-test"
-repo_root       = r"E:\Projects\university-projects"
-preview_file    = "commit-preview.txt"
+# --- Default configuration (override via CLI options or ReplayConfig) ---
+IS_TEST          = True   # <-- Set to False (or pass --live) for live Git commits
+ORIGINAL_FOLDER  = r"E:\uni"
+TRIMMED_FOLDER   = r"E:\uni-test"
+REPO_ROOT        = r"E:\Projects\university-projects"
+PREVIEW_FILE     = "commit-preview.txt"
+PREVIEW_JSONL    = "commit-preview.jsonl"  # Same preview as JSON Lines (None = text only)
+GIT_BACKEND      = "fast-import"   # "fast-import" (one git process) or "porcelain" (git add/commit per group)
+SCAN_WORKERS     = 8               # Threads used to walk top-level subtrees concurrently
+INDEX_FILE       = "archive-index.sqlite"  # Persistent scan/replay index (None = full rescan every run)
+MATCH_BY_CONTENT = True            # Find originals of moved/renamed files by content hash
+HASH_WORKERS     = 8               # Threads used for content hashing
+PUSH             = False           # Push once after all commits are made (the README's offline use never pushes)
+CHECKPOINT_EVERY = 100             # fast-import: make commits durable and record progress every N groups
+GROUPING         = "year-module"   # "year-module", "semester-course", "depth:N" or a regex for the top-level folder
+MATERIALISE      = "copy"          # Working-tree files: "copy", "reflink", "hardlink", "copy_file_range" or "none" (objects only)
 
 # --- Date Settings ---
-cutoff = datetime(2017, 3, 1, tzinfo=timezone.utc)
-fallback_date = datetime(2017, 3, 2, tzinfo=timezone.utc)
+CUTOFF = datetime(2017, 3, 1, tzinfo=timezone.utc)
+FALLBACK_DATE = datetime(2017, 3, 2, tzinfo=timezone.utc)
+
+@dataclass
+class ReplayConfig:
+    """Everything one replay needs; defaults match the configuration above."""
+    original_folder: str = ORIGINAL_FOLDER
+    trimmed_folder: str = TRIMMED_FOLDER
+    repo_root: str = REPO_ROOT
+    preview_file: str = PREVIEW_FILE
+    preview_jsonl: str = PREVIEW_JSONL
+    is_test: bool = IS_TEST
+    cutoff: datetime = CUTOFF
+    fallback_date: datetime = FALLBACK_DATE
+    git_backend: str = GIT_BACKEND
+    scan_workers: int = SCAN_WORKERS
+    index_file: str = INDEX_FILE
+    match_by_content: bool = MATCH_BY_CONTENT
+    hash_workers: int = HASH_WORKERS
+    materialise: str = MATERIALISE
+    grouping: str = GROUPING
+    push: bool = PUSH
+    checkpoint_every: int = CHECKPOINT_EVERY
+
+    def __post_init__(self):
+        # Git commands run with cwd=repo_root, so relative folders would resolve against it
+        self.original_folder = os.path.abspath(self.original_folder)
+        self.trimmed_folder = os.path.abspath(self.trimmed_folder)
+        self.repo_root = os.path.abspath(self.repo_root)
 
 # --- Helper: check git availability ---
 def ensure_git_available():
+    """Exit with a message if git isn't installed (CLI use)."""
     try:
         subprocess.run(["git", "--version"], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
     except (subprocess.CalledProcessError, FileNotFoundError):
         print("❌ Git not found! Please install Git and ensure it's available in your PATH.")
         sys.exit(1)
 
-if not is_test:
-    ensure_git_available()
+# --- Helper: parallel filesystem scan ---
+def _list_dir(directory):
+    """List one directory as (subdirs, files).
+
+    subdirs are (name, path) pairs and files are (name, stat_result) pairs.
+    Symlinked directories are skipped (like os.walk), and an entry that
+    can't be stat'ed (e.g. a broken symlink) is reported and skipped
+    without losing the rest of the listing.
+    """
+    subdirs, files = [], []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    if entry.is_symlink():
+                        print(f"⚠️  Skipping symlinked directory {entry.path}")
+                    else:
+                        subdirs.append((entry.name, entry.path))
+                    continue
+                # DirEntry caches stat results (free on Windows, one call elsewhere)
+                files.append((entry.name, entry.stat()))
+            except OSError as e:
+                print(f"⚠️  Skipping {entry.path}: {e}")
+    return subdirs, files
+
+def _scan_subtree(top, prefix):
+    """Walk one subtree with os.scandir, returning (relpath, mtime_ns, size) rows."""
+    rows = []
+    stack = [(top, prefix)]
+    while stack:
+        directory, rel_dir = stack.pop()
+        try:
+            subdirs, files = _list_dir(directory)
+        except OSError as e:
+            print(f"⚠️  Could not scan {directory}: {e}")
+            continue
+        for name, path in subdirs:
+            stack.append((path, os.path.join(rel_dir, name) if rel_dir else name))
+        for name, st in files:
+            rows.append((os.path.join(rel_dir, name) if rel_dir else name, st.st_mtime_ns, st.st_size))
+    return rows
+
+def _require_dir(root):
+    """Raise FileNotFoundError with a readable message if a tree's root is missing."""
+    if not os.path.isdir(root):
+        raise FileNotFoundError(f"Folder not found: {root}")
+
+def scan_tree(root, workers=SCAN_WORKERS):
+    """Scan a tree into a (relpath, mtime_ns, size) table, sorted by relpath.
+
+    Top-level subdirectories are walked concurrently in a thread pool.
+
+    Raises:
+        FileNotFoundError: If root isn't a directory
+    """
+    _require_dir(root)
+    subdirs, files = _list_dir(root)
+    subtrees = [(path, name) for name, path in subdirs]
+    rows = [(name, st.st_mtime_ns, st.st_size) for name, st in files]
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for subtree_rows in pool.map(lambda args: _scan_subtree(*args), subtrees):
+            rows.extend(subtree_rows)
+
+    rows.sort()
+    return rows
+
+# --- Helper: persistent scan index ---
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    tree TEXT NOT NULL, relpath TEXT NOT NULL, mtime_ns INTEGER NOT NULL, subdirs TEXT NOT NULL,
+    PRIMARY KEY (tree, relpath));
+CREATE TABLE IF NOT EXISTS files (
+    tree TEXT NOT NULL, parent TEXT NOT NULL, name TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, hash TEXT, hash_key TEXT,
+    PRIMARY KEY (tree, parent, name));
+CREATE TABLE IF NOT EXISTS replayed_files (
+    repo TEXT NOT NULL, relpath TEXT NOT NULL, group_key TEXT NOT NULL,
+    PRIMARY KEY (repo, relpath));
+CREATE TABLE IF NOT EXISTS module_commits (
+    repo TEXT NOT NULL, module_key TEXT NOT NULL, commits INTEGER NOT NULL,
+    PRIMARY KEY (repo, module_key));
+"""
+
+def open_index(path):
+    """Open (creating if needed) the SQLite scan/replay index."""
+    conn = sqlite3.connect(path)
+    conn.executescript(INDEX_SCHEMA)
+    # Indexes from before hash_key existed: their hashes get re-validated
+    if "hash_key" not in {row[1] for row in conn.execute("PRAGMA table_info(files)")}:
+        conn.execute("ALTER TABLE files ADD COLUMN hash_key TEXT")
+    return conn
+
+def _refresh_dir(root, rel_dir, cached_dirs, cached_files, changed):
+    """Return (subdirs, file_rows) for a directory, listing it only if its mtime changed.
+
+    A directory's mtime changes when entries are added, removed or renamed in
+    it, so an unchanged directory reuses its cached file rows and subdirectory
+    list and costs a single stat. Rescanned directories are added to `changed`.
+    A directory that can't be listed keeps its cached rows (or none) and is
+    left out of `changed`, so it is listed again on the next run.
+
+    Returns None if the directory no longer exists.
+    """
+    directory = os.path.join(root, rel_dir) if rel_dir else root
+    try:
+        dir_mtime = os.stat(directory).st_mtime_ns
+    except OSError:
+        return None
+
+    cached = cached_dirs.get(rel_dir)
+    if cached and cached[0] == dir_mtime:
+        return cached[1], cached_files.get(rel_dir, [])
+
+    try:
+        listed_dirs, listed_files = _list_dir(directory)
+    except OSError as e:
+        print(f"⚠️  Could not scan {directory}: {e}")
+        return (cached[1] if cached else []), cached_files.get(rel_dir, [])
+
+    subdirs, file_rows = [name for name, _ in listed_dirs], []
+    old_rows = {row[0]: row for row in cached_files.get(rel_dir, [])}
+    for name, st in listed_files:
+        old = old_rows.get(name)
+        # Carry a known content hash over; hash_files re-validates it before use
+        known = old[3:5] if old and old[1:3] == (st.st_mtime_ns, st.st_size) else (None, None)
+        file_rows.append((name, st.st_mtime_ns, st.st_size, *known))
+    changed[rel_dir] = (dir_mtime, subdirs, file_rows)
+    return subdirs, file_rows
+
+def _scan_subtree_indexed(root, rel_top, cached_dirs, cached_files):
+    """Walk one subtree incrementally.
+
+    Returns:
+        tuple: (rows, changed, seen) where rows are (relpath, mtime_ns, size),
+        changed maps rel_dir -> (mtime_ns, subdirs, file_rows) for rescanned
+        directories and seen is the set of directories that still exist
+    """
+    rows, changed, seen = [], {}, set()
+    stack = [rel_top]
+    while stack:
+        rel_dir = stack.pop()
+        listing = _refresh_dir(root, rel_dir, cached_dirs, cached_files, changed)
+        if listing is None:
+            continue
+        seen.add(rel_dir)
+        subdirs, file_rows = listing
+        for name, mtime_ns, size, *_ in file_rows:
+            rows.append((os.path.join(rel_dir, name) if rel_dir else name, mtime_ns, size))
+        stack.extend(os.path.join(rel_dir, name) if rel_dir else name for name in subdirs)
+    return rows, changed, seen
+
+def scan_tree_indexed(conn, root, workers=SCAN_WORKERS):
+    """Incremental version of scan_tree backed by the persistent index.
+
+    Returns the same sorted (relpath, mtime_ns, size) table, but only lists
+    directories that changed since the last run and only stats those
+    directories' files.
+
+    Raises:
+        FileNotFoundError: If root isn't a directory
+    """
+    _require_dir(root)
+    tree = os.path.abspath(root)
+    cached_dirs = {
+        rel: (mtime_ns, [name for name in subdirs.split("\0") if name])
+        for rel, mtime_ns, subdirs in conn.execute(
+            "SELECT relpath, mtime_ns, subdirs FROM dirs WHERE tree = ?", (tree,))
+    }
+    cached_files = {}
+    for parent, name, mtime_ns, size, file_hash, hash_key in conn.execute(
+            "SELECT parent, name, mtime_ns, size, hash, hash_key FROM files WHERE tree = ?", (tree,)):
+        cached_files.setdefault(parent, []).append((name, mtime_ns, size, file_hash, hash_key))
+
+    # Root level in this thread, then each top-level subtree concurrently
+    changed, seen = {}, {""}
+    top_subdirs, top_files = _refresh_dir(root, "", cached_dirs, cached_files, changed)
+    rows = [(name, mtime_ns, size) for name, mtime_ns, size, *_ in top_files]
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = pool.map(lambda name: _scan_subtree_indexed(root, name, cached_dirs, cached_files),
+                           top_subdirs)
+        for sub_rows, sub_changed, sub_seen in results:
+            rows.extend(sub_rows)
+            changed.update(sub_changed)
+            seen.update(sub_seen)
+
+    # Persist only what changed
+    with conn:
+        for rel_dir, (mtime_ns, subdirs, file_rows) in changed.items():
+            conn.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?)",
+                         (tree, rel_dir, mtime_ns, "\0".join(subdirs)))
+            conn.execute("DELETE FROM files WHERE tree = ? AND parent = ?", (tree, rel_dir))
+            conn.executemany("INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             [(tree, rel_dir, *row) for row in file_rows])
+        for rel_dir in set(cached_dirs) - seen:
+            conn.execute("DELETE FROM dirs WHERE tree = ? AND relpath = ?", (tree, rel_dir))
+            conn.execute("DELETE FROM files WHERE tree = ? AND parent = ?", (tree, rel_dir))
+
+    print(f"📇 {tree}: {len(rows)} files, {len(changed)} changed of {len(seen)} directories")
+    rows.sort()
+    return rows
+
+def load_replay_state(conn, repo):
+    """Return (replayed relpaths, module commit counts) for a repository."""
+    repo = os.path.abspath(repo)
+    replayed = {rel for (rel,) in conn.execute("SELECT relpath FROM replayed_files WHERE repo = ?", (repo,))}
+    counts = dict(conn.execute("SELECT module_key, commits FROM module_commits WHERE repo = ?", (repo,)))
+    return replayed, counts
+
+def record_replayed(conn, repo, group_key, rel_paths, module_key, commit_number):
+    """Record that a commit group has been replayed into a repository."""
+    repo = os.path.abspath(repo)
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO replayed_files VALUES (?, ?, ?)",
+                         [(repo, rel, group_key) for rel in rel_paths])
+        conn.execute("INSERT OR REPLACE INTO module_commits VALUES (?, ?, ?)",
+                     (repo, module_key, commit_number))
+
+# --- Helper: content-hash matching of moved files ---
+def file_hash(path):
+    """BLAKE2b hex digest of a file's contents (None if unreadable)."""
+    digest = hashlib.blake2b(digest_size=20)
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+def hash_key(path):
+    """Identity of a file's current content for the hash cache (None if missing).
+
+    Besides mtime and size this includes the inode and ctime, which change
+    when a file is rewritten or edited in place even if its mtime is
+    restored afterwards.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{st.st_mtime_ns}:{st.st_size}:{st.st_ino}:{st.st_ctime_ns}"
+
+def _hash_with_key(path):
+    # Key first: a change during hashing then invalidates the entry next time
+    key = hash_key(path)
+    return file_hash(path), key
+
+def hash_files(conn, root, rel_paths, workers=HASH_WORKERS):
+    """Return {relpath: hash} for files under root, hashing in parallel.
+
+    Hashes are cached in the scan index with a hash_key, and a cached hash is
+    only reused while the file's current hash_key still matches.
+    """
+    tree = os.path.abspath(root)
+    wanted = set(rel_paths)
+    cached = {}
+    if conn:
+        for parent, name, file_hash_value, key in conn.execute(
+                "SELECT parent, name, hash, hash_key FROM files WHERE tree = ? AND hash IS NOT NULL", (tree,)):
+            rel = os.path.join(parent, name) if parent else name
+            if rel in wanted and key:
+                cached[rel] = (file_hash_value, key)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        cached_rels = list(cached)
+        current_keys = pool.map(lambda rel: hash_key(os.path.join(root, rel)), cached_rels)
+        hashes = {rel: cached[rel][0] for rel, key in zip(cached_rels, current_keys) if key == cached[rel][1]}
+
+        missing = [rel for rel in wanted if rel not in hashes]
+        if not missing:
+            return hashes
+        computed = list(zip(missing, pool.map(lambda rel: _hash_with_key(os.path.join(root, rel)), missing)))
+    for rel, (value, _) in computed:
+        if value:
+            hashes[rel] = value
+    if conn:
+        with conn:
+            conn.executemany("UPDATE files SET hash = ?, hash_key = ? WHERE tree = ? AND parent = ? AND name = ?",
+                             [(value, key, tree, os.path.dirname(rel), os.path.basename(rel))
+                              for rel, (value, key) in computed if value])
+    return hashes
+
+def match_moved_files(config, conn, original_rows, original_mtimes, unmatched_rows):
+    """Find the original of each trimmed file that isn't at the same relative path.
 
-# --- Init ---
-with open(preview_file, "w", encoding="utf-8") as f:
-    f.write("")
+    Only originals with the same size are hashed. When several originals have
+    identical content, one with the same file name wins, then the oldest.
 
-# Step 1: Build lookup of original file dates
-original_lookup = {}
-original_files = []
+    Args:
+        config: ReplayConfig
+        conn: Scan index connection (or None)
+        original_rows: (relpath, mtime_ns, size) rows of original_folder
+        original_mtimes: {relpath: datetime} of original files
+        unmatched_rows: (relpath, mtime_ns, size) rows of trimmed files to match
 
-for root, _, files in os.walk(original_folder):
-    for name in files:
-        full_path = os.path.join(root, name)
-        relative = os.path.relpath(full_path, original_folder)
-        mtime = datetime.utcfromtimestamp(os.path.getmtime(full_path)).replace(tzinfo=timezone.utc)
-        original_lookup[relative] = mtime
-        original_files.append((relative, mtime))
+    Returns:
+        dict: trimmed relpath -> original relpath
+    """
+    originals_by_size = {}
+    for rel, _, size in original_rows:
+        originals_by_size.setdefault(size, []).append(rel)
+
+    candidates = [row for row in unmatched_rows if row[2] in originals_by_size]
+    if not candidates:
+        return {}
+
+    trimmed_hashes = hash_files(conn, config.trimmed_folder, [rel for rel, _, _ in candidates],
+                                config.hash_workers)
+    original_hashes = hash_files(conn, config.original_folder,
+                                 [rel for _, _, size in candidates for rel in originals_by_size[size]],
+                                 config.hash_workers)
+    originals_by_hash = {}
+    for rel, value in original_hashes.items():
+        originals_by_hash.setdefault(value, []).append(rel)
+
+    matches = {}
+    for rel, _, _ in candidates:
+        same_content = originals_by_hash.get(trimmed_hashes.get(rel))
+        if same_content:
+            name = os.path.basename(rel)
+            matches[rel] = min(same_content, key=lambda o: (os.path.basename(o) != name, original_mtimes[o]))
+    print(f"🔎 Matched {len(matches)} of {len(unmatched_rows)} moved/renamed files by content")
+    return matches
+
+def mtime_to_datetime(mtime_ns):
+    return datetime.fromtimestamp(mtime_ns / 1e9, tz=timezone.utc)
+
+# --- Helper: file materialisation ---
+FICLONE = 0x40049409  # Linux ioctl: share extents with the source (btrfs, XFS, ...)
+
+def _reflink(src, dst):
+    import fcntl  # Not available on Windows; caller falls back to a copy
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+
+def _kernel_copy(src, dst):
+    """Copy inside the kernel with copy_file_range, or sendfile where that's missing."""
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        remaining = os.fstat(s.fileno()).st_size
+        copy = getattr(os, "copy_file_range", None)
+        while remaining > 0:
+            if copy:
+                sent = copy(s.fileno(), d.fileno(), remaining)
+            else:
+                sent = os.sendfile(d.fileno(), s.fileno(), None, remaining)
+            if sent == 0:
+                break
+            remaining -= sent
 
-original_files.sort(key=lambda x: x[1])
+def materialise_file(src, dst, strategy=MATERIALISE):
+    """Place src at dst using the cheapest available strategy.
 
-# Step 2: Compute first valid date after cutoff
-first_valid_date = next((dt for _, dt in original_files if dt >= cutoff), fallback_date)
+    Each strategy falls back to the next cheaper-to-support one when the OS
+    or filesystem can't do it: reflink -> copy_file_range -> copy, and
+    hardlink -> copy.
+    """
+    if strategy == "hardlink":
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            strategy = "copy"
+    if strategy == "reflink":
+        try:
+            _reflink(src, dst)
+            shutil.copystat(src, dst)
+            return
+        except (ImportError, OSError):
+            strategy = "copy_file_range"
+    if strategy == "copy_file_range":
+        try:
+            _kernel_copy(src, dst)
+            shutil.copystat(src, dst)
+            return
+        except (AttributeError, OSError):
+            pass
+    shutil.copy2(src, dst)
 
-# Step 3: Group trimmed files
-grouped_commits = {}
+# --- Helper: git fast-import backend ---
+def quote_git_path(path):
+    """Quote a path for fast-import if it needs it (C-style, like git itself)."""
+    if not path.startswith('"') and "\n" not in path:
+        return path
+    escaped = path.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'"{escaped}"'
 
-for root, _, files in os.walk(trimmed_folder):
-    for name in files:
-        full_path = os.path.join(root, name)
-        relative = os.path.relpath(full_path, trimmed_folder)
+def git_output(args, cwd):
+    """Run a git command and return its stripped stdout ("" on failure)."""
+    result = subprocess.run(["git", *args], cwd=cwd, stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL, text=True)
+    return result.stdout.strip() if result.returncode == 0 else ""
+
+def tracks_file_mode(repo):
+    """Whether git in this repo records the executable bit (core.filemode, on unless set false)."""
+    return git_output(["config", "--bool", "core.filemode"], repo) != "false"
+
+def git_file_mode(st_mode, filemode=True):
+    """Return the tree entry mode git add would record for a regular file."""
+    return "100755" if filemode and st_mode & stat.S_IXUSR else "100644"
+
+class FastImportStream:
+    """Streams commits, blobs and backdated dates into a single `git fast-import`.
+
+    Produces the same commits as the porcelain loop (git add + git commit with
+    GIT_AUTHOR_DATE/GIT_COMMITTER_DATE), without one process per file.
+    """
+
+    def __init__(self, repo, materialise=MATERIALISE):
+        self.repo = repo
+        self.materialise = materialise
+        self.ref = git_output(["symbolic-ref", "-q", "HEAD"], repo) or "refs/heads/master"
+        self.old_head = git_output(["rev-parse", "--verify", "-q", "HEAD"], repo)
+        name = git_output(["config", "user.name"], repo) or "ArchiveReplayer"
+        email = git_output(["config", "user.email"], repo) or "archive@replayer.local"
+        self.identity = f"{name} <{email}>"
+        self.filemode = tracks_file_mode(repo)
+        self.first_commit = True
+        self.imported = []  # (source, rel_path) pairs, for materialising the working tree
+        self.checkpointed = 0  # len(self.imported) at the last checkpoint
+        self.process = subprocess.Popen(
+            ["git", "fast-import", "--quiet", "--done", "--date-format=raw"],
+            cwd=repo, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.stream = self.process.stdin
+
+    def _data(self, payload):
+        self.stream.write(f"data {len(payload)}\n".encode())
+        self.stream.write(payload)
+        self.stream.write(b"\n")
+
+    def commit(self, message, commit_date, files):
+        """Write one commit.
+
+        Args:
+            message: Commit message
+            commit_date: Aware datetime used for author and committer
+            files: List of (source_path, repo_relative_path) pairs
+        """
+        when = f"{int(commit_date.timestamp())} +0000"
+        out = self.stream
+        out.write(f"commit {self.ref}\n".encode())
+        out.write(f"author {self.identity} {when}\n".encode())
+        out.write(f"committer {self.identity} {when}\n".encode())
+        # git commit -m ends the message with a newline
+        self._data(message.encode("utf-8") + b"\n")
+        if self.first_commit and self.old_head:
+            out.write(f"from {self.old_head}\n".encode())
+        self.first_commit = False
+
+        self.imported.extend(files)
+        for source, rel_path in files:
+            git_path = quote_git_path(rel_path.replace("\\", "/"))
+            st = os.stat(source)
+            out.write(f"M {git_file_mode(st.st_mode, self.filemode)} inline {git_path}\n".encode("utf-8"))
+            out.write(f"data {st.st_size}\n".encode())
+            with open(source, "rb") as src:
+                shutil.copyfileobj(src, out)
+            out.write(b"\n")
+        out.write(b"\n")
+
+    def checkpoint(self):
+        """Write out everything imported so far and update the branch.
+
+        Blocks until fast-import has finished the checkpoint, so commits made
+        before it survive a later failure.
+        """
+        self.stream.write(b"checkpoint\nprogress checkpoint\n")
+        self.stream.flush()
+        if not self.process.stdout.readline():
+            raise subprocess.CalledProcessError(self.process.wait(), "git fast-import")
+        self.checkpointed = len(self.imported)
+
+    def finish(self):
+        """Finish the import; the branch then points at the last commit."""
+        self.stream.write(b"done\n")
+        self.stream.close()
+        self.process.stdout.read()
+        if self.process.wait() != 0:
+            raise subprocess.CalledProcessError(self.process.returncode, "git fast-import")
+
+    def update_worktree(self):
+        """Bring the index and working tree up to date with the imported commits."""
+        self._update_worktree(self.imported)
+
+    def close(self):
+        """Finish the import and bring the index and working tree up to date."""
+        self.finish()
+        self.update_worktree()
+
+    def abort(self):
+        """Stop after a failure, keeping (and checking out) the last checkpoint."""
+        try:
+            self.stream.close()
+        except OSError:
+            pass
+        # Without "done", fast-import discards everything after the last checkpoint
+        self.process.stdout.read()
+        self.process.wait()
+        self._update_worktree(self.imported[:self.checkpointed])
+
+    def _update_worktree(self, imported):
+        if git_output(["rev-parse", "--verify", "-q", "HEAD"], self.repo) == self.old_head:
+            return  # Nothing was imported
+        if self.materialise == "copy":
+            # Same result as having committed from the working tree: check out the new tip
+            if self.old_head:
+                subprocess.run(["git", "read-tree", "-m", "-u", self.old_head, "HEAD"], cwd=self.repo, check=True)
+            else:
+                subprocess.run(["git", "read-tree", "--reset", "-u", "HEAD"], cwd=self.repo, check=True)
+            return
+
+        # Index only; blobs are already in the object store
+        if self.old_head:
+            subprocess.run(["git", "read-tree", "-m", self.old_head, "HEAD"], cwd=self.repo, check=True)
+        else:
+            subprocess.run(["git", "read-tree", "--reset", "HEAD"], cwd=self.repo, check=True)
+        if self.materialise == "none":
+            return
+
+        # Place files straight from the archive, then let git pick up their stat data
+        for source, rel_path in imported:
+            target_path = os.path.join(self.repo, rel_path)
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            if os.path.lexists(target_path):
+                os.remove(target_path)
+            materialise_file(source, target_path, self.materialise)
+        subprocess.run(["git", "update-index", "-q", "--refresh"], cwd=self.repo)
+
+# ===============================
+# Grouping rules
+# ===============================
+# Named patterns for the folder that starts a group; the folder below it is the module
+GROUPING_RULES = {
+    "year-module": r"Year\s*\d+",
+    "semester-course": r"(?:Semester|Sem|Term)\s*\d+",
+}
+DEPTH_RULE = re.compile(r"^depth:(\d+)$")
+PATH_SEPARATOR = re.compile(r"[\\/]")
+MODULE_FOLDER = re.compile(r"^(.+?)\s*-\s*(.+)$")
+UNKNOWN_GROUP = ("Unknown Year", "Unknown Module")
+
+class GroupingRule:
+    """Maps a directory to its (top folder, module folder) pair.
+
+    Either `top_pattern` (a compiled regex that must match a whole folder
+    name; the first matching folder starts the group and the next one is the
+    module) or `depth` (group by the first `depth` folders) is set.
+    Results are cached per directory, so cost scales with directory count.
+    """
+
+    def __init__(self, top_pattern=None, depth=None):
+        self.top_pattern = top_pattern
+        self.depth = depth
+        self._groups = {}
+
+    def group_for(self, relative):
+        """Return (top, module) for a path relative to the trimmed folder.
+
+        A file sitting directly in a top folder is its own module, as before.
+        """
+        directory, name = os.path.split(relative)
+        group = self._groups.get(directory)
+        if group is None:
+            group = self._groups[directory] = self._match(PATH_SEPARATOR.split(directory) if directory else [])
+        top, module = group
+        return (top, name) if module is None else group
+
+    def _match(self, folders):
+        if self.depth:
+            if not folders:
+                return UNKNOWN_GROUP
+            module = "/".join(folders[1:self.depth]) or folders[0]
+            return folders[0], module
+        for i, folder in enumerate(folders):
+            if self.top_pattern.fullmatch(folder):
+                return (folder, folders[i + 1]) if i + 1 < len(folders) else (folder, None)
+        return UNKNOWN_GROUP
+
+def compile_grouping(spec):
+    """Build a GroupingRule from a rule name, "depth:N" or a top-folder regex."""
+    depth = DEPTH_RULE.match(spec)
+    if depth:
+        return GroupingRule(depth=max(int(depth.group(1)), 1))
+    return GroupingRule(top_pattern=re.compile(GROUPING_RULES.get(spec, spec)))
+
+_module_names = {}
+
+def split_module_folder(module_folder):
+    """Split "CODE - Name" into (code, name); both are the folder name if there's no dash."""
+    parsed = _module_names.get(module_folder)
+    if parsed is None:
+        match = MODULE_FOLDER.match(module_folder)
+        parsed = match.groups() if match else (module_folder.strip(), module_folder.strip())
+        _module_names[module_folder] = parsed
+    return parsed
+
+# ===============================
+# Library API
+# ===============================
+@dataclass
+class PlannedCommit:
+    """One commit group, ready to be previewed or applied."""
+    group_key: str
+    day: str
+    commit_date: datetime
+    module_key: str
+    commit_number: int
+    message: str
+    files: list       # Full paths under trimmed_folder
+    rel_paths: list   # Paths relative to trimmed_folder (and repo_root)
+    type_counts: dict # Extension -> file count
+
+def scan(config, conn=None):
+    """Scan both trees.
+
+    Returns:
+        tuple: (original_rows, trimmed_rows) of (relpath, mtime_ns, size)
+    """
+    if conn:
+        return (scan_tree_indexed(conn, config.original_folder, config.scan_workers),
+                scan_tree_indexed(conn, config.trimmed_folder, config.scan_workers))
+    return (scan_tree(config.original_folder, config.scan_workers),
+            scan_tree(config.trimmed_folder, config.scan_workers))
+
+def group(config, original_rows, trimmed_rows, conn=None, replayed_paths=frozenset()):
+    """Resolve each trimmed file's commit date and module, and group them.
+
+    Args:
+        config: ReplayConfig
+        original_rows: Scan table of original_folder
+        trimmed_rows: Scan table of trimmed_folder
+        conn: Scan index connection (or None)
+        replayed_paths: Relative paths already replayed (skipped)
+
+    Returns:
+        dict: "YYYY-MM-DD|Year N\\Module" -> list of full paths
+    """
+    original_lookup = {relative: mtime_to_datetime(mtime_ns) for relative, mtime_ns, _ in original_rows}
+    trimmed_rows = [row for row in trimmed_rows if row[0] not in replayed_paths]
+
+    # Moved or renamed files keep their real dates via a content match
+    moved_matches = {}
+    if config.match_by_content:
+        unmatched_rows = [row for row in trimmed_rows if row[0] not in original_lookup]
+        if unmatched_rows:
+            moved_matches = match_moved_files(config, conn, original_rows, original_lookup, unmatched_rows)
+
+    cutoff = config.cutoff
+    rule = compile_grouping(config.grouping)
+    grouped_commits = {}
+    for relative, _, _ in trimmed_rows:
+        full_path = os.path.join(config.trimmed_folder, relative)
 
         # Resolve commit date
-        if relative in original_lookup:
-            original_date = original_lookup[relative]
+        source = relative if relative in original_lookup else moved_matches.get(relative)
+        if source:
+            original_date = original_lookup[source]
             if original_date < cutoff:
+                # Feb 29 becomes Feb 28 if the cutoff year isn't a leap year
                 commit_date = cutoff.replace(
                     month=original_date.month,
-                    day=original_date.day,
+                    day=min(original_date.day, calendar.monthrange(cutoff.year, original_date.month)[1]),
                     hour=original_date.hour,
                     minute=original_date.minute,
                     second=original_date.second
@@ -74,38 +748,29 @@ for root, _, files in os.walk(trimmed_folder):
             else:
                 commit_date = original_date
         else:
-            commit_date = fallback_date
-
-        # Extract module path
-        parts = re.split(r"[\\/]", relative)
-        year_part = next((p for p in parts if re.match(r"^Year\s*\d+$", p)), None)
-        if year_part and parts.index(year_part) + 1 < len(parts):
-            module_folder = parts[parts.index(year_part) + 1]
-            module_path = f"{year_part}\\{module_folder}"
-        else:
-            year_part = "Unknown Year"
-            module_folder = "Unknown Module"
-            module_path = f"{year_part}\\{module_folder}"
+            commit_date = config.fallback_date
+
+        # Module path (computed once per directory)
+        year_part, module_folder = rule.group_for(relative)
+        module_path = f"{year_part}\\{module_folder}"
 
         group_key = f"{commit_date.strftime('%Y-%m-%d')}|{module_path}"
         grouped_commits.setdefault(group_key, []).append(full_path)
+    return grouped_commits
 
-# Step 4–5: Process commit groups
-module_commit_counts = {}
-with open(preview_file, "a", encoding="utf-8") as f:
+def plan(config, grouped_commits, module_commit_counts):
+    """Yield a PlannedCommit per group, in date order.
 
+    module_commit_counts ("Year|Module" -> commits so far) is updated as
+    commits are planned, so it holds the totals once the generator is done.
+    """
     for group_key in sorted(grouped_commits.keys()):
         files = grouped_commits[group_key]
         day, module_path = group_key.split("|")
         commit_date = datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc)
 
         year_part, module_folder = module_path.split("\\", 1)
-        match = re.match(r"^(.+?)\s*-\s*(.+)$", module_folder)
-        if match:
-            module_code, module_name = match.groups()
-        else:
-            module_code = module_folder.strip()
-            module_name = module_folder.strip()
+        module_code, module_name = split_module_folder(module_folder)
 
         # Commit counter
         module_key = f"{year_part}|{module_folder}"
@@ -119,51 +784,276 @@ with open(preview_file, "a", encoding="utf-8") as f:
             type_counts[ext] = type_counts.get(ext, 0) + 1
         type_summary = ", ".join(f"{v} {k}" for k, v in sorted(type_counts.items()))
 
-        formatted_files = "\n".join("  - " + os.path.relpath(f, trimmed_folder) for f in files)
         commit_message = f"{module_code} - {module_name} ({year_part}) Commit #{commit_number} - {len(files)} files on {day}\nIncludes: {type_summary}"
+        yield PlannedCommit(group_key, day, commit_date, module_key, commit_number, commit_message,
+                            files, [os.path.relpath(f, config.trimmed_folder) for f in files], type_counts)
 
-        f.write(f"--- Commit Preview for {day} ---\n{commit_message}\nFiles:\n{formatted_files}\n\n")
-
-        if not is_test:
-            # --- Live mode ---
-            os.chdir(repo_root)
-            for file in files:
-                rel_path = os.path.relpath(file, trimmed_folder)
-                target_path = os.path.join(repo_root, rel_path)
-                os.makedirs(os.path.dirname(target_path), exist_ok=True)
-                if not os.path.exists(target_path):
-                    shutil.copy2(file, target_path)
-                subprocess.run(["git", "add", "--", target_path], check=True)
-
-            git_date = commit_date.isoformat()
-            env = os.environ.copy()
-            env["GIT_AUTHOR_DATE"] = git_date
-            env["GIT_COMMITTER_DATE"] = git_date
-
-            subprocess.run(["git", "commit", "-m", commit_message], check=True, env=env)
-            subprocess.run(["git", "push"], check=True, env=env)
-        else:
-            f.write("⚙️ [TEST MODE] No files copied or commits made.\n")
+def _apply_porcelain(config, commit):
+    """Commit one group with git add/commit."""
+    repo_root = config.repo_root
+    if config.materialise == "none":
+        # Write blobs straight into the object store and stage them, no working-tree copy
+        hashed = subprocess.run(["git", "hash-object", "-w", "--stdin-paths"], check=True, cwd=repo_root,
+                                input="\n".join(commit.files) + "\n", stdout=subprocess.PIPE, text=True)
+        filemode = tracks_file_mode(repo_root)
+        index_info = "".join(
+            f"{git_file_mode(os.stat(file).st_mode, filemode)} {sha}\t{rel_path.replace(os.sep, '/')}\n"
+            for file, rel_path, sha in zip(commit.files, commit.rel_paths, hashed.stdout.split()))
+        subprocess.run(["git", "update-index", "--add", "--index-info"], check=True, cwd=repo_root,
+                       input=index_info, text=True)
+    else:
+        for file, rel_path in zip(commit.files, commit.rel_paths):
+            target_path = os.path.join(repo_root, rel_path)
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            if not os.path.exists(target_path):
+                materialise_file(file, target_path, config.materialise)
+        # One git add for the whole group
+        subprocess.run(["git", "add", "--pathspec-from-file=-", "--pathspec-file-nul"], check=True, cwd=repo_root,
+                       input="\0".join(commit.rel_paths).encode("utf-8"))
+
+    git_date = commit.commit_date.isoformat()
+    env = os.environ.copy()
+    env["GIT_AUTHOR_DATE"] = git_date
+    env["GIT_COMMITTER_DATE"] = git_date
+
+    subprocess.run(["git", "commit", "-q", "-m", commit.message], check=True, env=env, cwd=repo_root)
 
-# Step 6: Summary
-summary_lines = ["\n--- Commit Totals per Module-Year ---", "Year\tModule Code\tModule Name\tTotal Commits"]
-total_commits = 0
+def apply(config, commits, conn=None):
+    """Create the planned commits in config.repo_root, then optionally push once.
 
-for key in sorted(module_commit_counts.keys()):
-    year_part, module_folder = key.split("|", 1)
-    match = re.match(r"^(.+?)\s*-\s*(.+)$", module_folder)
-    if match:
-        module_code, module_name = match.groups()
+    All commits are made locally first. Progress is recorded in the index
+    (per group for porcelain, at each checkpoint for fast-import), so a
+    failed run resumes from the last recorded group when rerun.
+
+    Args:
+        config: ReplayConfig
+        commits: Iterable of PlannedCommit
+        conn: Scan index connection; replayed groups are recorded in it
+
+    Returns:
+        int: Number of commits created
+    """
+    def record(done):
+        if conn:
+            for commit in done:
+                record_replayed(conn, config.repo_root, commit.group_key, commit.rel_paths,
+                                commit.module_key, commit.commit_number)
+
+    applied = 0
+    if config.git_backend == "fast-import":
+        importer = FastImportStream(config.repo_root, config.materialise)
+        pending_records = []  # Imported since the last checkpoint
+        try:
+            for commit in commits:
+                importer.commit(commit.message, commit.commit_date, list(zip(commit.files, commit.rel_paths)))
+                pending_records.append(commit)
+                if config.checkpoint_every and len(pending_records) >= config.checkpoint_every:
+                    importer.checkpoint()
+                    record(pending_records)
+                    applied += len(pending_records)
+                    pending_records = []
+        except BaseException:
+            importer.abort()
+            print(f"💾 Stopped after {applied} checkpointed commits; rerun to resume.")
+            raise
+        # The branch has moved once fast-import exits, so record before touching the working tree
+        importer.finish()
+        record(pending_records)
+        applied += len(pending_records)
+        try:
+            importer.update_worktree()
+        except (OSError, subprocess.CalledProcessError):
+            print(f"⚠️  All {applied} commits are made and recorded, but the working tree could not be "
+                  "updated. Move any conflicting files aside and run `git reset --hard` in the repository.")
+            raise
     else:
-        module_code = module_folder.strip()
-        module_name = module_folder.strip()
-    count = module_commit_counts[key]
-    total_commits += count
-    summary_lines.append(f"{year_part}\t{module_code}\t{module_name}\t{count}")
+        for commit in commits:
+            _apply_porcelain(config, commit)
+            record([commit])
+            applied += 1
+
+    if config.push:
+        subprocess.run(["git", "push"], check=True, cwd=config.repo_root)
+    return applied
+
+class PreviewWriter:
+    """Streams the commit preview as each group is planned.
+
+    Writes the human-readable text preview and, optionally, a JSON Lines
+    copy with one {"type": "commit", ...} record per group and a final
+    {"type": "summary", ...} record. Nothing is buffered beyond one line.
+    """
+
+    def __init__(self, text_file, jsonl_file=None, is_test=True):
+        self.is_test = is_test
+        self.text = open(text_file, "w", encoding="utf-8")
+        self.jsonl = open(jsonl_file, "w", encoding="utf-8") if jsonl_file else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.text.close()
+        if self.jsonl:
+            self.jsonl.close()
+
+    def write_commit(self, commit):
+        text = self.text
+        text.write(f"--- Commit Preview for {commit.day} ---\n{commit.message}\nFiles:\n")
+        for rel_path in commit.rel_paths:
+            text.write(f"  - {rel_path}\n")
+        text.write("\n")
+        if self.is_test:
+            text.write("⚙️ [TEST MODE] No files copied or commits made.\n")
+
+        if self.jsonl:
+            record = {
+                "type": "commit",
+                "group": commit.group_key,
+                "date": commit.day,
+                "module": commit.module_key,
+                "commit_number": commit.commit_number,
+                "message": commit.message,
+                "types": commit.type_counts,
+                "files": [rel_path.replace(os.sep, "/") for rel_path in commit.rel_paths],
+            }
+            self.jsonl.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def stream(self, commits):
+        """Pass commits through, writing each one's preview first."""
+        for commit in commits:
+            self.write_commit(commit)
+            yield commit
+
+    def write_summary(self, module_commit_counts):
+        """Append the per-module commit totals to the preview."""
+        summary_lines = ["\n--- Commit Totals per Module-Year ---", "Year\tModule Code\tModule Name\tTotal Commits"]
+        total_commits = 0
+
+        for key in sorted(module_commit_counts.keys()):
+            year_part, module_folder = key.split("|", 1)
+            module_code, module_name = split_module_folder(module_folder)
+            count = module_commit_counts[key]
+            total_commits += count
+            summary_lines.append(f"{year_part}\t{module_code}\t{module_name}\t{count}")
+
+        summary_lines.append(f"\nTotal Commits Across All Modules: {total_commits}")
+        self.text.write("\n".join(summary_lines))
 
-summary_lines.append(f"\nTotal Commits Across All Modules: {total_commits}")
+        if self.jsonl:
+            record = {"type": "summary", "modules": dict(sorted(module_commit_counts.items())),
+                      "total_commits": total_commits}
+            self.jsonl.write(json.dumps(record, ensure_ascii=False) + "\n")
 
-with open(preview_file, "a", encoding="utf-8") as f:
-    f.write("\n".join(summary_lines))
+def run(config):
+    """Scan, group, plan and (in live mode) apply one archive.
+
+    Safe to call repeatedly in one process: no globals, no chdir.
+
+    Returns:
+        dict: Module key -> total commits (including earlier runs)
+    """
+    conn = open_index(os.path.abspath(config.index_file)) if config.index_file else None
+    try:
+        original_rows, trimmed_rows = scan(config, conn)
+
+        # Files already replayed into repo_root on earlier runs are skipped
+        replayed_paths, module_commit_counts = (
+            load_replay_state(conn, config.repo_root) if conn else (set(), {}))
+        grouped_commits = group(config, original_rows, trimmed_rows, conn, replayed_paths)
+
+        with PreviewWriter(config.preview_file, config.preview_jsonl, config.is_test) as preview:
+            planned = preview.stream(plan(config, grouped_commits, module_commit_counts))
+            if config.is_test:
+                for _ in planned:
+                    pass
+            else:
+                apply(config, planned, conn)
+
+            preview.write_summary(module_commit_counts)
+    finally:
+        if conn:
+            conn.close()
+
+    print("✅ Test mode complete." if config.is_test else "🚀 Live commits complete.")
+    return module_commit_counts
+
+# ===============================
+# CLI
+# ===============================
+def _utc_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+
+def parse_args(argv=None):
+    defaults = ReplayConfig()
+    parser = argparse.ArgumentParser(
+        description="Replay archived project files into a Git repository as backdated commits.")
+    parser.add_argument("--live", action="store_true",
+                        help="Make real commits (default: test mode, preview only)")
+    parser.add_argument("--original", default=defaults.original_folder,
+                        help="Original archive (source of file dates)")
+    parser.add_argument("--trimmed", default=defaults.trimmed_folder,
+                        help="Trimmed copy whose files are committed")
+    parser.add_argument("--repo", default=defaults.repo_root, help="Target Git repository")
+    parser.add_argument("--preview", default=defaults.preview_file, help="Commit preview output file")
+    parser.add_argument("--preview-jsonl", default=defaults.preview_jsonl,
+                        help="JSON Lines preview output file ('none' to disable)")
+    parser.add_argument("--cutoff", type=_utc_date, default=defaults.cutoff,
+                        help="Dates before this are moved into its year (YYYY-MM-DD)")
+    parser.add_argument("--fallback-date", type=_utc_date, default=defaults.fallback_date,
+                        help="Date for files with no original (YYYY-MM-DD)")
+    parser.add_argument("--backend", choices=["fast-import", "porcelain"], default=defaults.git_backend,
+                        help="How commits are written")
+    parser.add_argument("--materialise", choices=["copy", "reflink", "hardlink", "copy_file_range", "none"],
+                        default=defaults.materialise, help="How files reach the working tree")
+    parser.add_argument("--push", action="store_true",
+                        help="Push once after all commits are made (default: stay offline)")
+    parser.add_argument("--checkpoint-every", type=int, default=defaults.checkpoint_every,
+                        help="fast-import: checkpoint and record progress every N groups (0 = only at the end)")
+    parser.add_argument("--grouping", default=defaults.grouping,
+                        help="Grouping rule: year-module, semester-course, depth:N or a top-folder regex")
+    parser.add_argument("--index", default=defaults.index_file,
+                        help="Scan/replay index file ('none' to disable)")
+    parser.add_argument("--no-content-match", action="store_true",
+                        help="Don't match moved/renamed files by content hash")
+    parser.add_argument("--scan-workers", type=int, default=defaults.scan_workers)
+    parser.add_argument("--hash-workers", type=int, default=defaults.hash_workers)
+    args = parser.parse_args(argv)
+
+    return ReplayConfig(
+        original_folder=args.original,
+        trimmed_folder=args.trimmed,
+        repo_root=args.repo,
+        preview_file=args.preview,
+        preview_jsonl=None if str(args.preview_jsonl).lower() == "none" else args.preview_jsonl,
+        is_test=not args.live and defaults.is_test,
+        cutoff=args.cutoff,
+        fallback_date=args.fallback_date,
+        git_backend=args.backend,
+        scan_workers=args.scan_workers,
+        index_file=None if str(args.index).lower() == "none" else args.index,
+        match_by_content=not args.no_content_match and defaults.match_by_content,
+        hash_workers=args.hash_workers,
+        materialise=args.materialise,
+        grouping=args.grouping,
+        push=args.push or defaults.push,
+        checkpoint_every=args.checkpoint_every,
+    )
+
+def main(argv=None):
+    config = parse_args(argv)
+    if not config.is_test:
+        ensure_git_available()
+    try:
+        _require_dir(config.original_folder)
+        _require_dir(config.trimmed_folder)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    run(config)
 
-print("✅ Test mode complete." if is_test else "🚀 Live commits complete.")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import ArchiveReplayer as replayer
+
+# ===============================
+# ArchiveReplayer Benchmark
+# ===============================
+#
+# Builds a synthetic "Year N/<Code - Name>/..." archive (original + trimmed
+# copy), then times each ArchiveReplayer stage against it:
+#
+#   python ArchiveReplayerBench.py --files 200 --modules 6 --years 3
+#   python ArchiveReplayerBench.py --keep bench-archive --backends fast-import
+#
+# Timings include tracemalloc overhead unless --no-tracemalloc is given.
+
+# --- Generator defaults ---
+SEED = 1234
+YEARS = 3
+MODULES_PER_YEAR = 4
+FILES_PER_MODULE = 100
+DEPTH = 2                 # Folder levels below each module
+BRANCHING = 3             # Subfolders per level
+MEAN_FILE_BYTES = 4096    # Log-normal file sizes around this
+TRIM_RATIO = 0.8          # Share of original files kept in the trimmed copy
+RENAME_RATIO = 0.05       # Share of kept files moved/renamed (exercises content matching)
+START_DATE = datetime(2015, 9, 1, tzinfo=timezone.utc)
+
+EXTENSIONS = [".py", ".java", ".c", ".txt", ".md", ".pdf", ".docx", ".png"]
+MODULE_NAMES = ["Intro", "Calculus", "Algorithms", "Databases", "Networks", "Graphics",
+                "Compilers", "Statistics", "Security", "Robotics", "Logic", "Systems"]
+
+# --- Helper: synthetic archive ---
+def _mtime(rng, distribution, year_start, deadlines):
+    """Pick a modification time within one academic year."""
+    if distribution == "deadlines":
+        # Work piles up in the days before a few deadlines
+        deadline = rng.choice(deadlines)
+        moment = deadline - timedelta(days=abs(rng.gauss(0, 4)), seconds=rng.randrange(86400))
+    else:
+        moment = year_start + timedelta(seconds=rng.randrange(300 * 86400))
+    return int(moment.timestamp() * 1e9)
+
+def generate_archive(root, years=YEARS, modules_per_year=MODULES_PER_YEAR, files_per_module=FILES_PER_MODULE,
+                     depth=DEPTH, branching=BRANCHING, mean_bytes=MEAN_FILE_BYTES, distribution="uniform",
+                     trim_ratio=TRIM_RATIO, rename_ratio=RENAME_RATIO, seed=SEED):
+    """Create root/original and root/trimmed synthetic archive trees.
+
+    Trimmed files are hard links to their originals where possible (same
+    content either way); a share of them are renamed so they only match by
+    content.
+
+    Returns:
+        tuple: (original_folder, trimmed_folder, original file count, trimmed file count)
+    """
+    rng = random.Random(seed)
+    original = os.path.join(root, "original")
+    trimmed = os.path.join(root, "trimmed")
+    original_count = trimmed_count = 0
+
+    for year in range(1, years + 1):
+        year_start = START_DATE.replace(year=START_DATE.year + year - 1)
+        for module in range(modules_per_year):
+            code = f"CS{year}{module:02d}"
+            name = MODULE_NAMES[(year * modules_per_year + module) % len(MODULE_NAMES)]
+            module_rel = os.path.join(f"Year {year}", f"{code} - {name}")
+            deadlines = [year_start + timedelta(days=rng.randrange(20, 290)) for _ in range(4)]
+
+            folders = [""]
+            for _ in range(depth):
+                folders = [os.path.join(parent, f"part{i}") if parent else f"part{i}"
+                           for parent in folders for i in range(branching)]
+
+            for index in range(files_per_module):
+                folder = rng.choice(folders)
+                file_name = f"file{index:05d}{rng.choice(EXTENSIONS)}"
+                rel_path = os.path.join(module_rel, folder, file_name)
+                source = os.path.join(original, rel_path)
+                os.makedirs(os.path.dirname(source), exist_ok=True)
+                size = max(1, int(rng.lognormvariate(0, 1) * mean_bytes / 1.65))
+                with open(source, "wb") as f:
+                    f.write(rng.randbytes(size))
+                mtime = _mtime(rng, distribution, year_start, deadlines)
+                os.utime(source, ns=(mtime, mtime))
+                original_count += 1
+
+                if rng.random() >= trim_ratio:
+                    continue
+                if rng.random() < rename_ratio:
+                    rel_path = os.path.join(module_rel, folder, f"renamed_{file_name}")
+                target = os.path.join(trimmed, rel_path)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                try:
+                    os.link(source, target)
+                except OSError:
+                    shutil.copy2(source, target)
+                trimmed_count += 1
+
+    return original, trimmed, original_count, trimmed_count
+
+# --- Helper: measurement ---
+def measure(results, stage, files, use_tracemalloc, fn, *args):
+    """Run fn(*args), recording wall time and peak traced memory."""
+    if use_tracemalloc:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] if use_tracemalloc else None
+        if use_tracemalloc:
+            tracemalloc.stop()
+        results.append((stage, elapsed, files, peak))
+
+def init_repo(path):
+    """Create an empty throwaway repository to replay into."""
+    os.makedirs(path)
+    for args in (["init", "-q"], ["config", "user.name", "Bench"], ["config", "user.email", "bench@replayer.local"]):
+        subprocess.run(["git"] + args, cwd=path, check=True)
+
+def drain(commits):
+    count = 0
+    for _ in commits:
+        count += 1
+    return count
+
+def print_report(results):
+    print(f"\n{'Stage':<28}{'Seconds':>10}{'Files/s':>12}{'Peak MiB':>10}")
+    for stage, elapsed, files, peak in results:
+        rate = f"{files / elapsed:,.0f}" if elapsed > 0 else "-"
+        memory = f"{peak / 2**20:.1f}" if peak is not None else "-"
+        print(f"{stage:<28}{elapsed:>10.3f}{rate:>12}{memory:>10}")
+
+# --- Benchmark ---
+def run_benchmark(work_dir, args):
+    results = []
+    use_tracemalloc = not args.no_tracemalloc
+
+    print("🏗️  Generating synthetic archive...")
+    started = time.perf_counter()
+    original, trimmed, original_count, trimmed_count = generate_archive(
+        work_dir, args.years, args.modules, args.files, args.depth, args.branching,
+        args.mean_bytes, args.mtimes, args.trim_ratio, args.rename_ratio, args.seed)
+    print(f"   {original_count} original / {trimmed_count} trimmed files in {time.perf_counter() - started:.1f}s")
+    scanned = original_count + trimmed_count
+
+    config = replayer.ReplayConfig(
+        original_folder=original, trimmed_folder=trimmed,
+        preview_file=os.path.join(work_dir, "commit-preview.txt"),
+        preview_jsonl=os.path.join(work_dir, "commit-preview.jsonl"),
+        index_file=None, scan_workers=args.scan_workers, hash_workers=args.hash_workers)
+
+    # Scan: plain walk, then a cold and a warm run of the persistent index
+    original_rows, trimmed_rows = measure(results, "scan", scanned, use_tracemalloc, replayer.scan, config)
+    conn = replayer.open_index(os.path.join(work_dir, "index.sqlite"))
+    measure(results, "scan (index, cold)", scanned, use_tracemalloc, replayer.scan, config, conn)
+    measure(results, "scan (index, warm)", scanned, use_tracemalloc, replayer.scan, config, conn)
+    conn.close()
+
+    grouped = measure(results, "group", trimmed_count, use_tracemalloc,
+                      replayer.group, config, original_rows, trimmed_rows)
+
+    def preview():
+        with replayer.PreviewWriter(config.preview_file, config.preview_jsonl) as writer:
+            counts = {}
+            drain(writer.stream(replayer.plan(config, grouped, counts)))
+            writer.write_summary(counts)
+    measure(results, "plan + preview", trimmed_count, use_tracemalloc, preview)
+    print(f"   {sum(len(files) for files in grouped.values())} files in {len(grouped)} commit groups")
+
+    if not args.skip_live:
+        replayer.ensure_git_available()
+        for backend in args.backends.split(","):
+            repo = os.path.join(work_dir, f"repo-{backend}")
+            init_repo(repo)
+            live_config = replayer.ReplayConfig(
+                original_folder=original, trimmed_folder=trimmed, repo_root=repo, is_test=False,
+                index_file=None, git_backend=backend, materialise=args.materialise)
+            commits = replayer.plan(live_config, grouped, {})
+            measure(results, f"replay ({backend})", trimmed_count, use_tracemalloc,
+                    replayer.apply, live_config, commits)
+
+    print_report(results)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ArchiveReplayer on a synthetic archive")
+    parser.add_argument("--years", type=int, default=YEARS)
+    parser.add_argument("--modules", type=int, default=MODULES_PER_YEAR, help="Modules per year")
+    parser.add_argument("--files", type=int, default=FILES_PER_MODULE, help="Original files per module")
+    parser.add_argument("--depth", type=int, default=DEPTH, help="Folder levels below each module")
+    parser.add_argument("--branching", type=int, default=BRANCHING, help="Subfolders per level")
+    parser.add_argument("--mean-bytes", type=int, default=MEAN_FILE_BYTES, help="Typical file size")
+    parser.add_argument("--mtimes", choices=["uniform", "deadlines"], default="uniform",
+                        help="Modification time distribution within each year")
+    parser.add_argument("--trim-ratio", type=float, default=TRIM_RATIO)
+    parser.add_argument("--rename-ratio", type=float, default=RENAME_RATIO)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--scan-workers", type=int, default=replayer.SCAN_WORKERS)
+    parser.add_argument("--hash-workers", type=int, default=replayer.HASH_WORKERS)
+    parser.add_argument("--backends", default="fast-import,porcelain",
+                        help="Comma-separated backends to replay with")
+    parser.add_argument("--materialise", default=replayer.MATERIALISE,
+                        choices=["copy", "reflink", "hardlink", "copy_file_range", "none"])
+    parser.add_argument("--skip-live", action="store_true", help="Don't replay into a Git repository")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="Time without memory tracing")
+    parser.add_argument("--keep", help="Build everything in this (new) folder and keep it")
+    args = parser.parse_args()
+
+    if args.keep:
+        os.makedirs(args.keep)
+        run_benchmark(os.path.abspath(args.keep), args)
+    else:
+        with tempfile.TemporaryDirectory(prefix="archive-bench-") as work_dir:
+            run_benchmark(work_dir, args)
+
+if __name__ == "__main__":
+    main()
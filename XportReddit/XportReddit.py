@@ -7,14 +7,27 @@ import time
 import random
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.action_chains import ActionChains
 import json
 from pathlib import Path
 
+from post_metadata import record_post_metadata, summarise_post, load_metadata_cache
+from tolerant_json import load_json_tolerant
+from posted_filter import update_posted_filter, archive_stamp
+from reddit_api import fetch_reddit_post, extract_media_urls, select_media_urls
+from post_index import extract_post_id
+from liveness_scan import fresh_verdict, UNPUBLISHABLE
+from media_preprocess import preprocess_media, prune_media_cache
+from post_fingerprint import FingerprintIndex, media_hashes
+from thread_packing import plan_thread, estimate_upload_seconds, estimate_thread_seconds
+from post_metrics import METRICS, timed, stage_timer
+from webdriver_profiler import profile_driver
+from resource_blocking import enable_resource_blocking, forget_tab as forget_blocked_tab
+from browser_memory import sample_browser_memory, exceeded_limit, forget_tab as forget_sampled_tab
+from selector_registry import SELECTORS
+
 # ============================================================
 # CONFIGURATION
 # ============================================================
@@ -22,6 +35,26 @@ UPLOAD_TIMEOUT = 90     # Max seconds to wait for media uploads
 POST_RETRY_ATTEMPTS = 5 # Number of times to retry posting
 SAVED_POSTS_FILE = "reddit_saved_posts.json"  # File to read URLs from
 POSTED_URLS_FILE = "reddit_posted_urls.json"  # File to store successfully posted URLs
+MEDIA_TARGET_EDGE = 1080          # Smallest image long edge (px) to download; None = full-resolution originals
+MEDIA_TARGET_VIDEO_HEIGHT = 720   # Smallest video rendition to download; None = Reddit's fallback (highest)
+MEDIA_IMAGE_BYTE_BUDGET = 5_000_000    # Stay under X's 5 MB image limit
+MEDIA_VIDEO_BYTE_BUDGET = 512_000_000  # X's video upload limit
+PREPROCESS_MEDIA = True           # Resize/recompress/transcode downloads before upload (needs Pillow/ffmpeg)
+PREPROCESS_WORKERS = 4            # Threads used for preprocessing
+MEDIA_CACHE_MAX_BYTES = 2_000_000_000  # Processed media cache size cap (least recently used removed first)
+MEDIA_CACHE_MAX_AGE_DAYS = 30          # Drop processed files unused for this long
+CHECK_DUPLICATES = True           # Skip posts matching the local fingerprint index before composing
+METRICS_ENABLED = True            # Per-stage timings -> xportreddit_trace.jsonl + xportreddit_metrics.prom
+PROFILE_WEBDRIVER = False         # Record every WebDriver round-trip and print a top-N report at exit
+PROFILE_TOP_N = 15
+BLOCK_TIMELINE_MEDIA = False      # Block timeline images/videos and trackers in the X tab (uploads unaffected)
+COMPOSE_STRATEGY = "direct"       # "direct": reuse an empty composer or open x.com/compose/post; "home": click New Post on the timeline
+COMPOSE_URL = "https://x.com/compose/post"
+MEMORY_SAMPLE_EVERY = 1           # Sample the X tab's JS heap/DOM size every N posts (0 = off)
+MEMORY_LIMITS = {'js_heap_used_mb': 700, 'dom_nodes': 200_000}  # Recycle when any is exceeded
+RECYCLE_MODE = "tab"              # "tab": reopen X in a fresh tab; "session": restart Edge (closes all Edge windows); None: only record
+EDGE_PATH = r"C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe"
+EDGE_DEBUG_PORT = 9222
 # ============================================================
 
 # ============================================================
@@ -48,6 +81,8 @@ def ensure_x_tab_active(driver):
             driver.switch_to.window(window_handle)
             if 'x.com' in driver.current_url or 'twitter.com' in driver.current_url:
                 print(f"  🔄 Switched to X tab", flush=True)
+                if BLOCK_TIMELINE_MEDIA:
+                    enable_resource_blocking(driver)
                 return True
         
         # No X tab found, switch back to original
@@ -68,6 +103,7 @@ def human_delay(base_seconds, variance=0.3):
     delay = random.uniform(min_delay, max_delay)
     time.sleep(delay)
 
+@timed()
 def human_type(element, text, min_delay=0.05, max_delay=0.15, with_typos=False):
     """Type text character-by-character with human-like delays.
     
@@ -154,9 +190,7 @@ def visit_profile_and_scroll(driver):
         print("\n👤 [HUMAN BEHAVIOR] Visiting profile...")
         
         # Click profile link
-        profile_link = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="AppTabBar_Profile_Link"]'))
-        )
+        profile_link = SELECTORS.find(driver, 'profile_link', timeout=10)
         driver.execute_script("arguments[0].click();", profile_link)
         human_delay(2.0, variance=0.5)
         
@@ -180,9 +214,7 @@ def visit_profile_and_scroll(driver):
         
         # Return to home feed
         print("   Returning to home feed...")
-        home_link = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="AppTabBar_Home_Link"]'))
-        )
+        home_link = SELECTORS.find(driver, 'home_link', timeout=10)
         driver.execute_script("arguments[0].click();", home_link)
         human_delay(2.0, variance=0.5)
         
@@ -226,8 +258,10 @@ def load_saved_posts():
         return []
     
     try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        # Tolerates trailing commas and a truncated tail from an interrupted save
+        data, repairs = load_json_tolerant(json_file)
+        for repair in repairs:
+            print(f"🔧 Repaired {json_file.name}: {repair}")
         
         urls = data.get('urls', [])
         print(f"✅ Loaded {len(urls)} saved posts from {json_file.name}")
@@ -263,12 +297,23 @@ def save_saved_posts(urls):
         print(f"⚠️  Warning: Could not save updated list: {e}")
         return False
 
-def add_to_posted_urls(url, status='success'):
+def add_to_posted_urls(url, status='success', title=None):
     """Add URL to the posted URLs archive file.
     
     Args:
         url: Reddit post URL that was posted
-        status: Status of the post ('success', 'manual', 'skipped')
+        status: Status of the post ('success', 'manual', 'skipped', 'unavailable')
+        title: Title that was (or would have been) posted, kept for duplicate detection
+    """
+    return add_many_to_posted_urls([url], status=status, title=title)
+
+def add_many_to_posted_urls(urls, status='success', title=None):
+    """Add several URLs to the posted URLs archive with one read and one write.
+    
+    Args:
+        urls: Reddit post URLs
+        status: Status recorded for every URL
+        title: Optional title recorded for every URL
     """
     # Use the same directory as the main saved posts file
     downloads_path = Path.home() / "Downloads" / POSTED_URLS_FILE
@@ -290,113 +335,86 @@ def add_to_posted_urls(url, status='success'):
         except:
             posted_data = {'urls': []}
     
-    # Add new entry with timestamp
+    # Add new entries with timestamp
     from datetime import datetime
-    entry = {
-        'url': url,
-        'status': status,
-        'posted_at': datetime.now().isoformat()
-    }
-    posted_data['urls'].append(entry)
+    for url in urls:
+        entry = {
+            'url': url,
+            'status': status,
+            'posted_at': datetime.now().isoformat()
+        }
+        if title:
+            entry['title'] = title
+        posted_data['urls'].append(entry)
     
     # Save updated list
     try:
+        previous_stamp = archive_stamp(json_file)
         with open(json_file, 'w', encoding='utf-8') as f:
             json.dump(posted_data, f, indent=2, ensure_ascii=False)
+        # Keep the ingest scripts' "already posted" filter in step
+        update_posted_filter(urls, json_file, previous_stamp)
         return True
     except Exception as e:
         print(f"⚠️  Warning: Could not save to posted URLs archive: {e}")
         return False
 
-def get_reddit_images(post_url):
-    """Fetch images from Reddit post.
+def drop_unpublishable_posts(urls):
+    """Archive and remove posts already known to be unpublishable.
     
+    Uses verdicts from liveness_scan.py (and media counts cached by earlier
+    runs), so deleted, removed and media-less posts never reach the browser.
+    Verdicts older than the scan's max age are ignored, like the scan does.
+    
+    Args:
+        urls: List of Reddit post URLs
+        
     Returns:
-        tuple: (image_urls, post_title)
+        list: URLs that may still be publishable
     """
-    # Ensure .json endpoint
-    if not post_url.endswith('.json'):
-        if post_url.endswith('/'):
-            post_url += '.json'
+    cache = load_metadata_cache()
+    kept = []
+    unavailable = []
+    dropped = {}
+    for url in urls:
+        verdict = fresh_verdict(cache.get(extract_post_id(url)))
+        if verdict in UNPUBLISHABLE:
+            dropped[verdict] = dropped.get(verdict, 0) + 1
+            unavailable.append(url)
         else:
-            post_url += '/.json'
+            kept.append(url)
     
-    # Use more complete headers to avoid 403 blocks
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'DNT': '1',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1'
-    }
-    
-    try:
-        resp = requests.get(post_url, headers=headers, timeout=10)
-        resp.raise_for_status()
-    except requests.exceptions.HTTPError as e:
-        if e.response.status_code == 403:
-            print(f"\n⚠️  Reddit blocked the request (403). Trying alternative method...")
-            # Try without .json - scrape HTML instead or use old.reddit.com
-            alt_url = post_url.replace('.json', '').replace('www.reddit.com', 'old.reddit.com') + '.json'
-            resp = requests.get(alt_url, headers=headers, timeout=10)
-            resp.raise_for_status()
-        else:
-            raise
+    if dropped:
+        add_many_to_posted_urls(unavailable, status='unavailable')
+        summary = ", ".join(f"{count} {verdict}" for verdict, count in sorted(dropped.items()))
+        print(f"🚫 Dropped {len(urls) - len(kept)} unpublishable posts ({summary})")
+        save_saved_posts(kept)
+    return kept
+
+# Posts whose metadata this run has already appended to the cache
+_metadata_recorded = set()
+
+@timed()
+def get_reddit_images(post_url):
+    """Fetch images from Reddit post.
     
-    data = resp.json()
-    post = data[0]['data']['children'][0]['data']
+    Returns:
+        tuple: (image_urls, post_title)
+    """
+    post = fetch_reddit_post(post_url)
     post_title = post.get('title', 'Reddit Post')
-    image_urls = []
+    # Smallest renditions that still meet the configured targets
+    image_urls = select_media_urls(post, MEDIA_TARGET_EDGE, MEDIA_TARGET_VIDEO_HEIGHT,
+                                   MEDIA_IMAGE_BYTE_BUDGET, MEDIA_VIDEO_BYTE_BUDGET)
 
-    # Handle Reddit gallery
-    if post.get('is_gallery'):
-        media_metadata = post.get('media_metadata', {})
-        for item in post.get('gallery_data', {}).get('items', []):
-            media_id = item['media_id']
-            meta = media_metadata.get(media_id, {})
-            if meta.get('status') == 'valid':
-                s = meta.get('s', {})
-                # Try multiple possible keys for the URL
-                img_url = (
-                    s.get('u') or
-                    s.get('gif') or
-                    s.get('mp4') or
-                    s.get('url')
-                )
-                if img_url:
-                    img_url = img_url.replace('&amp;', '&')
-                    image_urls.append(img_url)
-    # Handle single image (Reddit-hosted)
-    elif post.get('post_hint') == 'image' and 'url' in post:
-        image_urls.append(post['url'])
-    # Handle Reddit-hosted video or GIF
-    elif post.get('post_hint') == 'hosted:video' and 'media' in post:
-        reddit_video = post['media'].get('reddit_video')
-        if reddit_video and 'fallback_url' in reddit_video:
-            video_url = reddit_video['fallback_url']
-            image_urls.append(video_url)
-    # Handle GIFs (as MP4)
-    elif post.get('post_hint') == 'rich:video' and 'preview' in post:
-        if 'reddit_video_preview' in post['preview']:
-            video_url = post['preview']['reddit_video_preview']['fallback_url']
-            image_urls.append(video_url)
-    # Handle preview images (fallback)
-    elif 'preview' in post and 'images' in post['preview']:
-        for img in post['preview']['images']:
-            img_url = img['source']['url'].replace('&amp;', '&')
-            image_urls.append(img_url)
-    # Handle Imgur direct links
-    elif 'imgur.com' in post.get('url', ''):
-        url = post['url']
-        if not url.endswith(('.jpg', '.png', '.gif', '.mp4')):
-            url += '.jpg'
-        image_urls.append(url)
-    # Add more handlers as needed
+    # Cache metadata so sorting/scheduling tools don't need to re-fetch (once per run)
+    if post.get('id') not in _metadata_recorded:
+        record_post_metadata(summarise_post(post, extract_media_urls(post)))
+        _metadata_recorded.add(post.get('id'))
 
     return image_urls, post_title
 
+@timed()
 def download_images(image_urls, folder):
     file_paths = []
     for i, url in enumerate(tqdm(image_urls, desc="Downloading images")):
@@ -410,9 +428,14 @@ def download_images(image_urls, folder):
     return file_paths
 
 def batch_images_for_x(image_paths, batch_size=4):
-    """Batch images into groups of 4 for X threading."""
-    return [image_paths[i:i + batch_size] for i in range(0, len(image_paths), batch_size)]
+    """Pack media into tweets for X threading.
+
+    Up to batch_size images per tweet, each video/GIF alone, original order
+    kept, fewest tweets with upload bytes balanced across them.
+    """
+    return plan_thread(image_paths, batch_size)
 
+@timed()
 def check_if_post_published(driver, post_title, timeout=5):
     """Check if the post was successfully published by looking for the title text on the page.
     
@@ -435,12 +458,8 @@ def check_if_post_published(driver, post_title, timeout=5):
         end_time = time.time() + timeout
         while time.time() < end_time:
             # Check if compose modal is closed
-            try:
-                compose_modal = driver.find_element(By.CSS_SELECTOR, '[aria-labelledby="modal-header"]')
-                if not compose_modal.is_displayed():
-                    modal_closed = True
-            except:
-                # Modal not found = closed
+            if SELECTORS.locate(driver, 'compose_modal', visible=True) is None:
+                # Modal not found or hidden = closed
                 modal_closed = True
             
             # Check if URL changed (navigated to post page)
@@ -513,6 +532,7 @@ def check_for_duplicate_post(driver):
     except:
         return False
 
+@timed()
 def wait_for_upload_completion(driver, timeout=UPLOAD_TIMEOUT):
     """Wait for all media uploads to complete (important for videos).
     
@@ -528,22 +548,20 @@ def wait_for_upload_completion(driver, timeout=UPLOAD_TIMEOUT):
     while time.time() - start_time < timeout:
         try:
             # Primary check: Post button state (disabled = still uploading)
-            post_buttons = driver.find_elements(By.CSS_SELECTOR, '[data-testid="tweetButton"], [data-testid="tweetButtonInline"]')
+            button = SELECTORS.locate(driver, 'post_button', visible=True, within='compose_modal')
             
             button_enabled = False
-            for button in post_buttons:
-                if button.is_displayed():
-                    is_disabled = button.get_attribute('disabled') or button.get_attribute('aria-disabled') == 'true'
-                    if not is_disabled:
-                        button_enabled = True
-                        
-                    # Log button state changes
-                    current_state = 'enabled' if not is_disabled else 'disabled'
-                    if last_button_state != current_state:
-                        if time.time() - start_time > 2:  # Only log after initial wait
-                            print(f"  🔘 Post button: {current_state}", flush=True)
-                        last_button_state = current_state
-                    break
+            if button is not None:
+                is_disabled = button.get_attribute('disabled') or button.get_attribute('aria-disabled') == 'true'
+                if not is_disabled:
+                    button_enabled = True
+                    
+                # Log button state changes
+                current_state = 'enabled' if not is_disabled else 'disabled'
+                if last_button_state != current_state:
+                    if time.time() - start_time > 2:  # Only log after initial wait
+                        print(f"  🔘 Post button: {current_state}", flush=True)
+                    last_button_state = current_state
             
             # Secondary check: Look for upload status text (less reliable)
             status_keywords = ['Uploading', 'Processing', 'Encoding', 'Compressing', 'Preparing']
@@ -579,13 +597,15 @@ def wait_for_upload_completion(driver, timeout=UPLOAD_TIMEOUT):
     print(f"  ⚠️  Upload check timed out after {timeout}s - continuing anyway")
     return False
 
-def upload_images_selenium(driver, image_paths, tweet_index=0):
+@timed()
+def upload_images_selenium(driver, image_paths, tweet_index=0, upload_timeout=60):
     """Upload images using Selenium file input.
     
     Args:
         driver: WebDriver instance
         image_paths: List of file paths to upload
         tweet_index: Index of the tweet in thread (0 for first, 1 for second, etc.)
+        upload_timeout: Max seconds to wait for video uploads to finish
     """
     try:
         print(f"\n  📤 Uploading {len(image_paths)} file(s) to tweet {tweet_index + 1}...")
@@ -595,9 +615,7 @@ def upload_images_selenium(driver, image_paths, tweet_index=0):
         has_video = any(any(path.lower().endswith(ext) for ext in video_extensions) for path in image_paths)
         
         # Find the file input element (X uses a hidden input with data-testid="fileInput")
-        file_input = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'input[data-testid="fileInput"]'))
-        )
+        file_input = SELECTORS.find(driver, 'file_input', timeout=10, within='compose_modal')
         
         # Send all file paths at once (newline-separated for multiple files)
         files_string = '\n'.join(image_paths)
@@ -609,7 +627,7 @@ def upload_images_selenium(driver, image_paths, tweet_index=0):
         if has_video:
             print(f"  ℹ️  Video detected, waiting for upload to complete...", flush=True)
             human_delay(2.0, variance=0.3)  # Initial wait for upload to start
-            wait_for_upload_completion(driver, timeout=60)
+            wait_for_upload_completion(driver, timeout=upload_timeout)
         else:
             # Images upload quickly, just brief wait
             human_delay(2.0, variance=0.3)
@@ -624,6 +642,7 @@ def upload_images_selenium(driver, image_paths, tweet_index=0):
         print(f"  ⚠️  Upload failed: {e}")
         return False
 
+@timed()
 def click_post_button_selenium(driver):
     """Click the Post button using Selenium.
     
@@ -633,24 +652,8 @@ def click_post_button_selenium(driver):
     try:
         print("\n  📤 Clicking 'Post' button...")
         
-        # Try multiple button selectors (Post all, Post, etc.)
-        post_button = None
-        selectors = [
-            '[data-testid="tweetButton"]',  # Modal "Post all" or "Post" button
-            '[data-testid="tweetButtonInline"]',  # Inline composer button
-        ]
-        
-        for selector in selectors:
-            try:
-                post_button = driver.find_element(By.CSS_SELECTOR, selector)
-                if post_button and post_button.is_displayed():
-                    print(f"     Found button: {selector}")
-                    break
-            except:
-                continue
-        
-        if not post_button:
-            raise Exception("Could not find any Post button")
+        # Modal "Post all"/"Post" button, else the inline composer's
+        post_button = SELECTORS.find(driver, 'post_button', timeout=5, visible=True, within='compose_modal')
         
         # Use JavaScript click to avoid interception issues
         driver.execute_script("arguments[0].click();", post_button)
@@ -671,9 +674,7 @@ def click_add_button_selenium(driver):
     try:
         print("\n  ➕ Adding new tweet to thread...")
         
-        add_button = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="addButton"]'))
-        )
+        add_button = SELECTORS.find(driver, 'add_button', timeout=10, within='compose_modal')
         # Use JavaScript click to avoid interception
         driver.execute_script("arguments[0].click();", add_button)
         
@@ -746,67 +747,240 @@ def prompt_user_for_post_action(post_title, auto_mode=False):
 
 
 
+# One round-trip: is there a composer modal, and is it untouched?
+# (The inline composer on the home timeline doesn't count.)
+COMPOSER_STATE_SCRIPT = """
+const first = (root, selectors) => {
+    for (const selector of selectors) {
+        try {
+            const found = root.querySelector(selector);
+            if (found) return found;
+        } catch (e) {}
+    }
+    return null;
+};
+const modal = first(document, arguments[1]);
+const textarea = modal && first(modal, arguments[0]);
+if (!textarea) return 'none';
+const untouched = !textarea.textContent.trim()
+    && !modal.querySelector('[data-testid="tweetTextarea_1"]')
+    && !modal.querySelector('[data-testid="attachments"]');
+return untouched ? 'empty' : 'dirty';
+"""
+
+def wait_for_compose_ready(driver, timeout=15):
+    """Wait until the compose modal's text area and file input both exist.
+    
+    Returns:
+        bool: True if compose is ready
+    """
+    try:
+        SELECTORS.find(driver, 'text_area', timeout, within='compose_modal')
+        SELECTORS.find(driver, 'file_input', timeout=2, within='compose_modal')
+        return True
+    except TimeoutException:
+        return False
+
+def close_composer(driver):
+    """Close a leftover composer, discarding its draft."""
+    ActionChains(driver).send_keys(Keys.ESCAPE).perform()
+    human_delay(1.0, variance=0.5)
+    # X asks whether to save the draft
+    for button in driver.find_elements(By.CSS_SELECTOR, '[data-testid="confirmationSheetCancel"]'):
+        driver.execute_script("arguments[0].click();", button)
+        human_delay(0.5, variance=0.3)
+        break
+
+@timed()
 def open_x_compose(driver):
-    """Open the compose modal on X.
+    """Open the compose modal on X and wait until it is ready.
+    
+    With COMPOSE_STRATEGY "direct", an empty composer left open is reused
+    as-is; otherwise x.com/compose/post is opened without going through
+    the home timeline. "home" clicks New Post on the timeline (the old way).
     
     Args:
         driver: WebDriver instance
         
     Returns:
-        bool: True if compose opened successfully
+        bool: True if compose is open and ready
     """
     print("  📝 Opening compose modal...", flush=True)
     
-    try:        # Make sure we're on the X tab
+    try:
+        # Make sure we're on the X tab
         if not ensure_x_tab_active(driver):
             print("⚠️  Not on X tab, navigating...", flush=True)
-            driver.get("https://x.com/home")
-            human_delay(3.0, variance=0.3)        
-        # First, check if compose is already open (from previous post)
-        try:
-            existing_compose = driver.find_element(By.CSS_SELECTOR, '[data-testid="tweetTextarea_0"]')
-            if existing_compose:
-                print("  ℹ️  Compose already open from previous post, closing it...", flush=True)
-                # Press Escape to close the modal
-                from selenium.webdriver.common.keys import Keys
-                from selenium.webdriver.common.action_chains import ActionChains
-                ActionChains(driver).send_keys(Keys.ESCAPE).perform()
-                human_delay(1.0, variance=0.5)
-        except:
-            pass  # No existing compose, which is good
+            driver.get(COMPOSE_URL if COMPOSE_STRATEGY == "direct" else "https://x.com/home")
+            human_delay(1.0, variance=0.3)
         
-        # Make sure we're on X home
-        if 'x.com/home' not in driver.current_url:
-            driver.get("https://x.com/home")
-            human_delay(3.0, variance=0.3)
+        state = driver.execute_script(COMPOSER_STATE_SCRIPT, SELECTORS.ranked('text_area'),
+                                      SELECTORS.ranked('compose_modal'))
+        if state == 'empty' and COMPOSE_STRATEGY == "direct":
+            if wait_for_compose_ready(driver, timeout=2):
+                print("  ✅ Reusing open composer", flush=True)
+                return True
+        elif state == 'dirty' or (state == 'empty' and COMPOSE_STRATEGY != "direct"):
+            print("  ℹ️  Compose already open from previous post, closing it...", flush=True)
+            close_composer(driver)
         
-        # Try clicking the compose button
-        try:
-            compose_button = WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, 'a[data-testid="SideNav_NewTweet_Button"]'))
-            )
-            driver.execute_script("arguments[0].click();", compose_button)
+        if COMPOSE_STRATEGY == "direct":
+            driver.get(COMPOSE_URL)
+        else:
+            # Make sure we're on X home
+            if 'x.com/home' not in driver.current_url:
+                driver.get("https://x.com/home")
+                human_delay(3.0, variance=0.3)
+            
+            # Try clicking the compose button
+            try:
+                compose_button = SELECTORS.find(driver, 'new_post_button', timeout=5)
+                driver.execute_script("arguments[0].click();", compose_button)
+            except:
+                # Fallback: use keyboard shortcut
+                ActionChains(driver).send_keys('n').perform()
+        
+        if wait_for_compose_ready(driver):
             print("  ✅ Compose modal opened", flush=True)
-            human_delay(2.0, variance=0.4)
-            return True
-        except:
-            # Fallback: use keyboard shortcut
-            from selenium.webdriver.common.action_chains import ActionChains
-            ActionChains(driver).send_keys('n').perform()
-            human_delay(2.0, variance=0.4)
-            print("  ✅ Compose opened via keyboard", flush=True)
+            human_delay(0.5, variance=0.4)
             return True
+        print("  ⚠️  Compose did not become ready", flush=True)
+        return False
             
     except Exception as e:
         print(f"  ⚠️  Failed to open compose: {e}", flush=True)
         return False
 
+def clear_temp_downloads(tmpdir):
+    """Delete the current post's downloaded files."""
+    try:
+        for filename in os.listdir(tmpdir):
+            file_path = os.path.join(tmpdir, filename)
+            if os.path.isfile(file_path):
+                os.remove(file_path)
+    except OSError:
+        pass
+
+def start_edge_driver(debug_port=EDGE_DEBUG_PORT):
+    """Start Edge with remote debugging and connect Selenium to it.
+    
+    Existing Edge windows are closed first, so this also serves to restart
+    the browser with a fresh set of processes.
+    
+    Args:
+        debug_port: Remote debugging port
+        
+    Returns:
+        WebDriver: Connected Edge driver
+    """
+    from selenium.webdriver.edge.options import Options
+    import subprocess
+    import socket
+    
+    options = Options()
+    
+    # Kill existing Edge processes
+    print("   Closing existing Edge windows...")
+    subprocess.run(['taskkill', '/F', '/IM', 'msedge.exe'], 
+                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(2)
+    
+    # Start Edge with debugging
+    print("   Starting Edge...")
+    subprocess.Popen([
+        EDGE_PATH, 
+        f'--remote-debugging-port={debug_port}',
+        '--no-first-run',
+        '--no-default-browser-check',
+        'https://x.com/home'
+    ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    
+    # Wait for Edge to start
+    def is_port_open(port):
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.settimeout(1)
+            result = sock.connect_ex(('127.0.0.1', port))
+            sock.close()
+            return result == 0
+        except:
+            return False
+    
+    print("   Waiting for browser to start...")
+    for i in range(15):
+        time.sleep(1)
+        if is_port_open(debug_port):
+            break
+    else:
+        raise Exception("Edge did not start with debugging port")
+    
+    # Connect to Edge
+    options.add_experimental_option("debuggerAddress", f"127.0.0.1:{debug_port}")
+    return webdriver.Edge(options=options)
+
+@timed()
+def recycle_x_tab(driver):
+    """Replace the X tab with a fresh one and close the old tab.
+    
+    The new tab gets a new renderer, dropping everything the old one
+    accumulated.
+    
+    Args:
+        driver: WebDriver instance
+        
+    Returns:
+        bool: True if the driver is now on the new tab
+    """
+    try:
+        old_handle = driver.current_window_handle
+        driver.switch_to.new_window('tab')
+        new_handle = driver.current_window_handle
+        if BLOCK_TIMELINE_MEDIA:
+            enable_resource_blocking(driver)  # Before the first load
+        driver.get(COMPOSE_URL if COMPOSE_STRATEGY == "direct" else "https://x.com/home")
+        
+        driver.switch_to.window(old_handle)
+        driver.close()
+        driver.switch_to.window(new_handle)
+        forget_blocked_tab(driver, old_handle)
+        forget_sampled_tab(driver, old_handle)
+        human_delay(2.0, variance=0.3)
+        return True
+    except Exception as e:
+        print(f"  ⚠️  Could not recycle X tab: {e}", flush=True)
+        return False
+
+@timed()
+def recycle_edge_session(driver):
+    """Restart Edge and reconnect (the login survives in the Edge profile).
+    
+    Args:
+        driver: Current WebDriver instance (quit here)
+        
+    Returns:
+        WebDriver: The new driver
+    """
+    # Tab bookkeeping lives on the driver, so the new one starts clean
+    try:
+        driver.quit()
+    except Exception:
+        pass
+    driver = start_edge_driver()
+    if BLOCK_TIMELINE_MEDIA:
+        enable_resource_blocking(driver)
+    human_delay(3.0, variance=0.3)
+    return driver
+
 if __name__ == "__main__":
     print("🚀 XportReddit - Reddit to X Thread Automation\n")
+    METRICS.configure(enabled=METRICS_ENABLED)
     
     # Load saved posts from JSON file
     reddit_urls = load_saved_posts()
     
+    # Drop deleted/removed/media-less posts found by liveness_scan.py
+    reddit_urls = drop_unpublishable_posts(reddit_urls)
+    
     if not reddit_urls:
         print("\n❌ No posts found. Please run parse_reddit_export.py first or")
         print("   use the browser extension to create reddit_saved_posts.json")
@@ -818,52 +992,10 @@ if __name__ == "__main__":
     print("🌐 Starting Edge browser...")
     
     try:
-        from selenium.webdriver.edge.options import Options
-        import subprocess
-        import socket
-        
-        options = Options()
-        debug_port = 9222
-        
-        # Kill existing Edge processes
-        print("   Closing existing Edge windows...")
-        subprocess.run(['taskkill', '/F', '/IM', 'msedge.exe'], 
-                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        time.sleep(2)
-        
-        # Start Edge with debugging
-        print("   Starting Edge...")
-        edge_path = r"C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe"
-        subprocess.Popen([
-            edge_path, 
-            f'--remote-debugging-port={debug_port}',
-            '--no-first-run',
-            '--no-default-browser-check',
-            'https://x.com/home'
-        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        
-        # Wait for Edge to start
-        def is_port_open(port):
-            try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(1)
-                result = sock.connect_ex(('127.0.0.1', port))
-                sock.close()
-                return result == 0
-            except:
-                return False
-        
-        print("   Waiting for browser to start...")
-        for i in range(15):
-            time.sleep(1)
-            if is_port_open(debug_port):
-                break
-        else:
-            raise Exception("Edge did not start with debugging port")
-        
-        # Connect to Edge
-        options.add_experimental_option("debuggerAddress", f"127.0.0.1:{debug_port}")
-        driver = webdriver.Edge(options=options)
+        driver = start_edge_driver()
+        profiler = profile_driver(driver) if PROFILE_WEBDRIVER else None
+        if BLOCK_TIMELINE_MEDIA and enable_resource_blocking(driver):
+            print("🚫 Blocking timeline media and trackers in this tab")
         
         print("✅ Connected to Edge!")
         print("   Make sure you're logged into X (Twitter)\n")
@@ -888,18 +1020,48 @@ if __name__ == "__main__":
     auto_mode = False  # Toggle for auto-processing
     posts_since_profile_visit = 0  # Track when to visit profile
     next_profile_visit = random.randint(5, 10)  # Visit profile every 5-10 posts
+    if PREPROCESS_MEDIA:
+        prune_media_cache(max_bytes=MEDIA_CACHE_MAX_BYTES, max_age_days=MEDIA_CACHE_MAX_AGE_DAYS)
+    fingerprints = FingerprintIndex.load() if CHECK_DUPLICATES else None
+    used_browser = False  # Whether the last post touched X (memory is only sampled then)
+    browser_posts = 0
     
     try:
         # Process each saved post (iterate over a copy to avoid issues when removing items)
         for idx, reddit_url in enumerate(reddit_urls[:], 1):
+            # Close the previous post's timing; its outcome is whichever counter moved
+            METRICS.end_post(processed=posts_processed, skipped=posts_skipped, failed=posts_failed)
+            SELECTORS.save()
+            
+            # Between posts is the safe point to check on (and recycle) the X tab,
+            # but only after posts that actually used it
+            if used_browser and MEMORY_SAMPLE_EVERY and browser_posts % MEMORY_SAMPLE_EVERY == 0:
+                ensure_x_tab_active(driver)
+                sample = sample_browser_memory(driver)
+                METRICS.record_sample('browser', sample)
+                reason = exceeded_limit(sample, MEMORY_LIMITS)
+                if reason and RECYCLE_MODE == "session":
+                    print(f"♻️  X tab over memory limit ({reason}), restarting Edge...", flush=True)
+                    driver = recycle_edge_session(driver)
+                    if profiler:
+                        profiler.attach(driver)
+                    print("✅ Continuing in a fresh Edge session\n")
+                elif reason and RECYCLE_MODE == "tab":
+                    print(f"♻️  X tab over memory limit ({reason}), reopening it...", flush=True)
+                    if recycle_x_tab(driver):
+                        print("✅ Continuing in a fresh tab\n")
+                    else:
+                        print("⚠️  Keeping the current tab\n")
+            used_browser = False
+            METRICS.begin_post(reddit_url, processed=posts_processed, skipped=posts_skipped, failed=posts_failed)
             print(f"\n{'='*60}")
             print(f"POST {idx}/{total_posts}")
             print(f"{'='*60}")
             
-            # Fetch post title from Reddit
+            # Fetch post title and media from Reddit (once; video posts cost a manifest request)
             print(f"📥 Fetching post info from Reddit...")
             try:
-                _, original_title = get_reddit_images(reddit_url)
+                image_urls, original_title = get_reddit_images(reddit_url)
             except Exception as e:
                 print(f"❌ Failed to fetch post: {e}")
                 posts_failed += 1
@@ -923,7 +1085,7 @@ if __name__ == "__main__":
                 posts_skipped += 1
                 
                 # Archive and remove from list
-                add_to_posted_urls(reddit_url, status='skipped')
+                add_to_posted_urls(reddit_url, status='skipped', title=original_title)
                 reddit_urls.remove(reddit_url)
                 if save_saved_posts(reddit_urls):
                     print(f"✅ Archived and removed from list ({len(reddit_urls)} remaining)\n")
@@ -938,55 +1100,63 @@ if __name__ == "__main__":
                 print(f"✏️  Using custom title: {post_title}")
             
             try:
-                print(f"\n📥 Fetching media from Reddit...", flush=True)
-                image_urls, _ = get_reddit_images(reddit_url)
-                
                 if not image_urls:
                     print("❌ No images found in this post.", flush=True)
                     continue
 
                 file_paths = download_images(image_urls, tmpdir)
+                if PREPROCESS_MEDIA:
+                    with stage_timer('preprocess_media'):
+                        file_paths = preprocess_media(file_paths, workers=PREPROCESS_WORKERS)
                 batches = batch_images_for_x(file_paths)
                 
-                print(f"\n📊 Found {len(image_urls)} images -> Creating {len(batches)} tweet(s) in thread")
+                # Catch reposts locally instead of after typing and uploading everything
+                hashes = media_hashes(file_paths) if fingerprints else []
+                duplicate, confidence = fingerprints.find_duplicate(post_title, hashes) if fingerprints else (None, None)
+                if duplicate:
+                    print(f"🧬 {confidence.capitalize()} duplicate of {duplicate['url']} "
+                          f"(posted {duplicate.get('posted_at') or 'earlier'})", flush=True)
+                    # Only distinctive matching media is enough to skip unattended
+                    if auto_mode:
+                        skip = confidence == 'likely'
+                        if not skip:
+                            print("   Not a confident match, posting anyway", flush=True)
+                    else:
+                        skip = input("   [s]kip or [p]ost anyway? ").lower().strip() != 'p'
+                    if skip:
+                        clear_temp_downloads(tmpdir)
+                        posts_skipped += 1
+                        add_to_posted_urls(reddit_url, status='skipped', title=post_title)
+                        reddit_urls.remove(reddit_url)
+                        save_saved_posts(reddit_urls)
+                        print(f"⏭️  Skipped duplicate ({len(reddit_urls)} remaining)\n")
+                        continue
+                
+                thread_cost = estimate_thread_seconds(batches)
+                print(f"\n📊 Found {len(image_urls)} images -> Creating {len(batches)} tweet(s) in thread "
+                      f"(~{thread_cost:.0f}s estimated upload)")
                 
                 # Open or switch to X tab
                 print("\n🧵 Setting up X compose...\n", flush=True)
                 
-                # Ensure we're on the X tab
-                ensure_x_tab_active(driver)
-                
-                # Make sure we're on X home
-                if 'x.com' not in driver.current_url and 'twitter.com' not in driver.current_url:
-                    print("  ⏳ Navigating to X...", flush=True)
-                    driver.get("https://x.com/home")
-                    time.sleep(3)
-                
-                # Open compose modal
-                open_x_compose(driver)
+                used_browser = True
+                browser_posts += 1
                 
-                # Verify compose modal is ready
-                print("  ⏳ Waiting for compose to load...", flush=True)
-                try:
-                    WebDriverWait(driver, 15).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="tweetTextarea_0"]'))
-                    )
-                    WebDriverWait(driver, 5).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, 'input[data-testid="fileInput"]'))
-                    )
-                    print("  ✅ Compose ready!", flush=True)
-                    time.sleep(2)
-                except Exception as e:
-                    print(f"  ❌ Compose not ready: {e}", flush=True)
+                # Open compose modal (ready = text area + file input present)
+                if not open_x_compose(driver):
+                    print("  ❌ Compose not ready", flush=True)
                     print("  💡 Please open compose manually (click + button or press N)")
                     input("     Press Enter when compose is open...")
                     time.sleep(1)
                 
                 # Build the entire thread before posting
+                first_file = 1
                 for i, batch in enumerate(batches):
-                    batch_nums = list(range(i*4 + 1, i*4 + len(batch) + 1))
+                    # Batches vary in size, so number files by running offset
+                    last_file = first_file + len(batch) - 1
                     print(f"\n{'='*60}")
-                    print(f"Tweet {i+1}/{len(batches)} - Images: {batch_nums[0]}-{batch_nums[-1]} ({len(batch)} files)")
+                    print(f"Tweet {i+1}/{len(batches)} - Images: {first_file}-{last_file} ({len(batch)} files)")
+                    first_file = last_file + 1
                     print(f"{'='*60}")
                     
                     # Add tweet text for first tweet only
@@ -996,9 +1166,7 @@ if __name__ == "__main__":
                             ensure_x_tab_active(driver)
                             
                             # Find the active text area in modal (tweet 0)
-                            text_area = WebDriverWait(driver, 10).until(
-                                EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="tweetTextarea_0"]'))
-                            )
+                            text_area = SELECTORS.find(driver, 'text_area', timeout=10, within='compose_modal')
                             
                             # Click to ensure focus
                             move_to_element_naturally(driver, text_area)
@@ -1019,7 +1187,8 @@ if __name__ == "__main__":
                             print(f"  ⚠️  Could not add title: {e}")
                     
                     # Upload images for this batch
-                    if not upload_images_selenium(driver, batch, i):
+                    upload_timeout = min(UPLOAD_TIMEOUT, max(60, 2 * estimate_upload_seconds(batch)))
+                    if not upload_images_selenium(driver, batch, i, upload_timeout):
                         print("\n  ⚠️  Upload failed. Skipping this batch...")
                         continue
                     
@@ -1070,7 +1239,7 @@ if __name__ == "__main__":
                                 pass
                             # Mark as skipped and break out of retry loop
                             posts_failed += 1
-                            add_to_posted_urls(reddit_url, status='skipped')
+                            add_to_posted_urls(reddit_url, status='skipped', title=post_title)
                             reddit_urls.remove(reddit_url)
                             save_saved_posts(reddit_urls)
                             posted = None  # Signal to skip further processing
@@ -1110,14 +1279,16 @@ if __name__ == "__main__":
                         print("  ⏳ Waiting for manual post...", flush=True)
                         input("     Press Enter after you post manually...")
                         # Archive as manually posted
-                        add_to_posted_urls(reddit_url, status='manual')
+                        add_to_posted_urls(reddit_url, status='manual', title=post_title)
+                        if fingerprints:
+                            fingerprints.add(reddit_url, post_title, hashes)
                         reddit_urls.remove(reddit_url)
                         save_saved_posts(reddit_urls)
                     elif user_choice == 's':
                         print("  ⏭️  Skipping this post", flush=True)
                         posts_failed += 1
                         # Archive as skipped
-                        add_to_posted_urls(reddit_url, status='skipped')
+                        add_to_posted_urls(reddit_url, status='skipped', title=post_title)
                         reddit_urls.remove(reddit_url)
                         save_saved_posts(reddit_urls)
                     elif user_choice == 'q':
@@ -1132,17 +1303,16 @@ if __name__ == "__main__":
                 print("="*60)
                 
                 # Clear temp directory
-                for filename in os.listdir(tmpdir):
-                    file_path = os.path.join(tmpdir, filename)
-                    if os.path.isfile(file_path):
-                        os.remove(file_path)
+                clear_temp_downloads(tmpdir)
 
                 print("✅ Done! Post processed successfully.\n", flush=True)
                 posts_processed += 1
                 posts_since_profile_visit += 1
                 
                 # Archive successful post and remove from pending list
-                add_to_posted_urls(reddit_url, status='success')
+                add_to_posted_urls(reddit_url, status='success', title=post_title)
+                if fingerprints:
+                    fingerprints.add(reddit_url, post_title, hashes)
                 reddit_urls.remove(reddit_url)
                 save_saved_posts(reddit_urls)
                 
@@ -1158,16 +1328,17 @@ if __name__ == "__main__":
                         next_profile_visit = random.randint(5, 10)
                         print(f"   Next profile visit in {next_profile_visit} posts\n")
                 
-                # Add delay between posts in auto mode (5-10 seconds per image)
+                # Add delay between posts in auto mode (5-10 seconds per image, plus the thread's upload cost)
                 if auto_mode and idx < len(reddit_urls):
-                    min_delay = len(image_urls) * 5
-                    max_delay = len(image_urls) * 10
+                    min_delay = len(image_urls) * 5 + thread_cost
+                    max_delay = len(image_urls) * 10 + thread_cost
                     delay = random.uniform(min_delay, max_delay)
                     remaining = len(reddit_urls)
-                    print(f"\n⏸️  [AUTO MODE] Waiting {delay:.0f}s before next post ({len(image_urls)} images × 5-10s)...")
+                    print(f"\n⏸️  [AUTO MODE] Waiting {delay:.0f}s before next post ({len(image_urls)} images × 5-10s + ~{thread_cost:.0f}s upload cost)...")
                     print(f"   Progress: {posts_processed} completed | {remaining} remaining")
                     print("   (Press Ctrl+C to stop)\n")
-                    time.sleep(delay)
+                    with stage_timer('pacing_delay'):
+                        time.sleep(delay)
                 
             except Exception as e:
                 print(f"❌ Error processing post: {e}", flush=True)
@@ -1176,13 +1347,7 @@ if __name__ == "__main__":
                 posts_failed += 1
                 
                 # Clear temp files
-                try:
-                    for filename in os.listdir(tmpdir):
-                        file_path = os.path.join(tmpdir, filename)
-                        if os.path.isfile(file_path):
-                            os.remove(file_path)
-                except:
-                    pass
+                clear_temp_downloads(tmpdir)
                 
                 print("🔄 Ready for next post...\n", flush=True)
         
@@ -1211,6 +1376,15 @@ if __name__ == "__main__":
         import traceback
         traceback.print_exc()
     finally:
+        METRICS.end_post(processed=posts_processed, skipped=posts_skipped, failed=posts_failed)
+        if METRICS.stages:
+            print("\n⏱️  Time per stage:")
+            print("\n".join(METRICS.summary_lines()))
+        METRICS.close()
+        SELECTORS.save()
+        if profiler:
+            print(f"\n🔬 WebDriver round-trips (top {PROFILE_TOP_N}):")
+            print("\n".join(profiler.report(PROFILE_TOP_N)))
         try:
             # Clean up temp directory
             if os.path.exists(tmpdir):
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Sample the X tab's memory between posts via the DevTools protocol
+
+An X tab kept open for hundreds of posts grows steadily (JS heap, DOM nodes,
+event listeners left behind by the timeline) until compose, typing and
+uploads slow down. Performance.getMetrics reports those counters for the
+current tab in one round-trip; the poster records them after every post and
+recycles the tab or the whole browser session once a limit is exceeded.
+"""
+
+# Performance.getMetrics name -> (our name, divisor)
+SAMPLED_METRICS = {
+    'JSHeapUsedSize': ('js_heap_used_mb', 1024 * 1024),
+    'JSHeapTotalSize': ('js_heap_total_mb', 1024 * 1024),
+    'Nodes': ('dom_nodes', 1),
+    'JSEventListeners': ('js_event_listeners', 1),
+    'Documents': ('documents', 1),
+}
+
+
+def _enabled_handles(driver):
+    """Return the set of this driver's tabs (window handles) with the Performance domain enabled."""
+    handles = getattr(driver, '_xport_performance_handles', None)
+    if handles is None:
+        handles = driver._xport_performance_handles = set()
+    return handles
+
+
+def sample_browser_memory(driver):
+    """Read memory counters for the driver's current tab.
+
+    Args:
+        driver: Chromium-based WebDriver (Edge/Chrome)
+
+    Returns:
+        dict: Metric name -> value (e.g. {'js_heap_used_mb': 212.4, ...}), or
+            an empty dict if the tab can't be sampled
+    """
+    try:
+        handle = driver.current_window_handle
+        if handle not in _enabled_handles(driver):
+            driver.execute_cdp_cmd('Performance.enable', {})
+            _enabled_handles(driver).add(handle)
+        response = driver.execute_cdp_cmd('Performance.getMetrics', {})
+    except Exception as e:
+        print(f"  ⚠️  Could not sample browser memory: {e}", flush=True)
+        return {}
+
+    sample = {}
+    for metric in response.get('metrics', []):
+        if metric.get('name') in SAMPLED_METRICS:
+            name, divisor = SAMPLED_METRICS[metric['name']]
+            value = metric['value'] / divisor
+            sample[name] = round(value, 1) if divisor > 1 else int(value)
+    return sample
+
+
+def exceeded_limit(sample, limits):
+    """Describe the first limit a sample is over.
+
+    Args:
+        sample: Result of sample_browser_memory
+        limits: Metric name -> maximum (None or 0 disables a limit)
+
+    Returns:
+        str: e.g. "js_heap_used_mb 812.0 > 600", or None if all are within limits
+    """
+    for name, limit in limits.items():
+        if limit and sample.get(name, 0) > limit:
+            return f"{name} {sample[name]} > {limit}"
+    return None
+
+
+def forget_tab(driver, handle):
+    """Drop a closed tab from the driver's bookkeeping."""
+    _enabled_handles(driver).discard(handle)
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Where the XportReddit tools keep their data files
+
+Caches, archives and metrics live next to the saved posts file: in
+Downloads if reddit_saved_posts.json is there, otherwise in this folder.
+"""
+
+from pathlib import Path
+
+SAVED_POSTS_FILE = "reddit_saved_posts.json"
+
+
+def data_dir():
+    """Return the folder that holds the saved posts file and everything kept next to it."""
+    if (Path.home() / "Downloads" / SAVED_POSTS_FILE).exists():
+        return Path.home() / "Downloads"
+    return Path(__file__).parent
+
+
+def data_path(name):
+    """Return the path of a data file (e.g. data_path("reddit_post_metadata.jsonl"))."""
+    return data_dir() / name
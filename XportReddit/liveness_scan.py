@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Pre-flight liveness scan for queued Reddit posts
+
+Classifies every URL in reddit_saved_posts.json before any browser work:
+
+    live_media   - post is up and has media we can upload
+    text_only    - post is up but has nothing to upload
+    removed      - deleted/removed by the author, moderators or Reddit
+    not_found    - Reddit returns 404
+    quarantined  - post lives in a quarantined subreddit
+    error        - couldn't check (network, rate limit); retried next scan
+
+Verdicts are appended to the post metadata cache. XportReddit drops queued
+posts with an unpublishable verdict before the posting loop starts.
+"""
+
+import argparse
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import requests
+
+from data_paths import SAVED_POSTS_FILE, data_path
+from post_index import extract_post_id
+from post_metadata import load_metadata_cache, record_post_metadata, summarise_post
+from reddit_api import fetch_reddit_post, extract_media_urls
+from tolerant_json import load_json_tolerant
+
+DEFAULT_WORKERS = 4          # Concurrent requests (Reddit rate-limits aggressively)
+DEFAULT_MAX_AGE_DAYS = 7     # Re-check cached verdicts older than this
+RATE_LIMIT_RETRIES = 3
+
+UNPUBLISHABLE = {'text_only', 'removed', 'not_found', 'quarantined'}
+FORBIDDEN_REASONS = {'private': 'removed', 'banned': 'removed', 'quarantined': 'quarantined'}
+
+
+def cached_verdict(record):
+    """Derive a verdict from a cached metadata record.
+
+    Records written by get_reddit_images have no explicit verdict, but their
+    media count tells us whether the post was publishable when fetched.
+
+    Args:
+        record: Metadata cache record (or None)
+
+    Returns:
+        str: Verdict, or None if the record can't tell
+    """
+    if not record:
+        return None
+    if record.get('verdict'):
+        return record['verdict']
+    if 'media_count' in record:
+        return 'live_media' if record['media_count'] else 'text_only'
+    return None
+
+
+def _checked_at(record):
+    stamp = record.get('checked_at') or record.get('fetched_at')
+    try:
+        return datetime.fromisoformat(stamp)
+    except (TypeError, ValueError):
+        return None
+
+
+def fresh_verdict(record, max_age_days=DEFAULT_MAX_AGE_DAYS):
+    """Return a cached verdict if it was checked within max_age_days.
+
+    'error' verdicts never count as fresh, so those posts are checked again.
+
+    Args:
+        record: Metadata cache record (or None)
+        max_age_days: Verdicts older than this are ignored
+
+    Returns:
+        str: Verdict, or None if there is no fresh one
+    """
+    verdict = cached_verdict(record)
+    if not verdict or verdict == 'error':
+        return None
+    checked_at = _checked_at(record)
+    if not checked_at or checked_at < datetime.now() - timedelta(days=max_age_days):
+        return None
+    return verdict
+
+
+def _forbidden_verdict(response):
+    """Classify a 403 from the reason Reddit gives in the body.
+
+    Only private, banned and quarantined subreddits are conclusive; any other
+    403 (e.g. Reddit blocking the client) is an 'error' to retry later.
+    """
+    try:
+        reason = str(response.json().get('reason', '')).lower()
+    except ValueError:
+        reason = ''
+    if reason in FORBIDDEN_REASONS:
+        return FORBIDDEN_REASONS[reason]
+    text = response.text.lower()
+    if 'quarantined' in text:
+        return 'quarantined'
+    if ('private' in text and 'subreddit' in text) or 'banned' in text:
+        return 'removed'
+    return 'error'
+
+
+def classify_post(post):
+    """Classify fetched post data.
+
+    Returns:
+        tuple: (verdict, media_urls)
+    """
+    if post.get('quarantine'):
+        return 'quarantined', []
+    if post.get('removed_by_category'):
+        return 'removed', []
+    media_urls = extract_media_urls(post)
+    if not media_urls:
+        if post.get('selftext') in ('[removed]', '[deleted]') or post.get('author') == '[deleted]':
+            return 'removed', []
+        return 'text_only', []
+    return 'live_media', media_urls
+
+
+def check_post(url, session):
+    """Fetch and classify one post.
+
+    Returns:
+        dict: Metadata record including 'verdict' and 'checked_at'
+    """
+    post_id = extract_post_id(url)
+    record = {'id': post_id}
+
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        try:
+            post = fetch_reddit_post(url, session=session)
+        except requests.exceptions.HTTPError as e:
+            status = e.response.status_code
+            if status == 429 and attempt < RATE_LIMIT_RETRIES:
+                retry_after = e.response.headers.get('Retry-After', '')
+                time.sleep(float(retry_after) if retry_after.isdigit() else 5 * (attempt + 1))
+                continue
+            if status == 404:
+                record['verdict'] = 'not_found'
+            elif status == 403:
+                record['verdict'] = _forbidden_verdict(e.response)
+                if record['verdict'] == 'error':
+                    record['error'] = "HTTP 403"
+            elif status == 451:
+                # Blocked for legal reasons
+                record['verdict'] = 'removed'
+            else:
+                record['verdict'] = 'error'
+                record['error'] = f"HTTP {status}"
+            break
+        except (requests.exceptions.RequestException, ValueError, LookupError) as e:
+            record['verdict'] = 'error'
+            record['error'] = str(e)
+            break
+        else:
+            verdict, media_urls = classify_post(post)
+            record = summarise_post(post, media_urls)
+            record['verdict'] = verdict
+            break
+
+    record['checked_at'] = datetime.now().isoformat()
+    return record
+
+
+def scan_urls(urls, workers=DEFAULT_WORKERS, max_age_days=DEFAULT_MAX_AGE_DAYS, recheck=False):
+    """Classify URLs, reusing fresh cached verdicts and checking the rest concurrently.
+
+    Args:
+        urls: Reddit post URLs to classify
+        workers: Number of concurrent requests
+        max_age_days: Cached verdicts older than this are re-checked
+        recheck: Ignore the cache entirely
+
+    Returns:
+        dict: URL -> verdict
+    """
+    cache = load_metadata_cache()
+    verdicts = {}
+    to_check = []
+
+    for url in urls:
+        post_id = extract_post_id(url)
+        if not post_id:
+            # Not a Reddit post URL; leave it for the posting loop to report
+            continue
+        verdict = None if recheck else fresh_verdict(cache.get(post_id), max_age_days)
+        if verdict:
+            verdicts[url] = verdict
+        else:
+            to_check.append(url)
+
+    print(f"🗂️  {len(verdicts)} verdicts from cache, checking {len(to_check)} posts with {workers} workers...")
+
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(check_post, url, session): url for url in to_check}
+        for done, future in enumerate(as_completed(futures), 1):
+            url = futures[future]
+            record = future.result()
+            verdicts[url] = record['verdict']
+            # Written from this thread only, so cache lines never interleave.
+            # Failed checks aren't cached: they'd replace the post's last good record
+            if record['verdict'] != 'error':
+                record_post_metadata(record)
+            if done % 50 == 0 or done == len(to_check):
+                print(f"   Checked {done}/{len(to_check)}", flush=True)
+
+    return verdicts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classify queued Reddit posts before posting")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"Concurrent requests (default: {DEFAULT_WORKERS})")
+    parser.add_argument('--max-age-days', type=float, default=DEFAULT_MAX_AGE_DAYS,
+                        help=f"Re-check cached verdicts older than this (default: {DEFAULT_MAX_AGE_DAYS})")
+    parser.add_argument('--recheck', action='store_true', help="Ignore cached verdicts")
+    args = parser.parse_args()
+
+    # Same lookup order as XportReddit.load_saved_posts
+    input_file = data_path(SAVED_POSTS_FILE)
+    if not input_file.exists():
+        print(f"❌ Could not find {SAVED_POSTS_FILE}")
+        return
+
+    data, repairs = load_json_tolerant(input_file)
+    for repair in repairs:
+        print(f"🔧 Repaired {input_file.name}: {repair}")
+    urls = data.get('urls', [])
+    print(f"📖 Loaded {len(urls)} queued posts from {input_file.name}")
+
+    verdicts = scan_urls(urls, workers=args.workers,
+                         max_age_days=args.max_age_days, recheck=args.recheck)
+
+    counts = Counter(verdicts.values())
+    print("\n📊 Liveness summary:")
+    for verdict, count in counts.most_common():
+        print(f"   {verdict:<12} {count}")
+    dead = sum(counts[v] for v in UNPUBLISHABLE)
+    print(f"\n✅ {counts['live_media']} publishable | 🚫 {dead} will be dropped by XportReddit")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Local media preprocessing before upload to X
+
+Downloaded files are made small and ready-to-post before the browser sees
+them, so X's client-side "Processing/Compressing" phase is short:
+
+- oversized images are downscaled and recompressed with Pillow
+- GIFs are converted to MP4 with ffmpeg
+- videos above X-friendly size/bitrate are transcoded with ffmpeg
+
+Pillow and ffmpeg are both optional; without them files pass through
+unchanged. Results are cached by content hash, so re-posting or retrying a
+post reuses the processed files; prune_media_cache keeps the cache within
+an age and size cap. Work runs in a thread pool: ffmpeg runs as its own
+process and Pillow releases the GIL while resizing and encoding, and
+threads avoid process start-up (a full re-import per worker on Windows).
+"""
+
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import blake2b
+from pathlib import Path
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional
+    Image = None
+
+from data_paths import data_path
+
+MEDIA_CACHE_DIR = "reddit_media_cache"        # Processed files, keyed by content hash
+
+MAX_IMAGE_EDGE = 2048            # X serves images at up to 2048px on the long edge
+MAX_IMAGE_BYTES = 5_000_000      # X rejects larger images
+JPEG_QUALITY = 85
+MAX_VIDEO_HEIGHT = 720
+VIDEO_TRANSCODE_ABOVE_BYTES = 15_000_000  # Smaller MP4s are uploaded as-is
+VIDEO_CRF = 23
+VIDEO_MAX_BITRATE = "5M"
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+CACHE_MAX_BYTES = 2_000_000_000  # Least recently used files go first above this
+CACHE_MAX_AGE_DAYS = 30
+
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.webm', '.mkv', '.flv')
+FFMPEG = shutil.which('ffmpeg')
+
+# Changes whenever settings or available tools change, so stale cache entries are ignored
+PIPELINE_VERSION = (f"1:{MAX_IMAGE_EDGE}:{MAX_IMAGE_BYTES}:{JPEG_QUALITY}:{MAX_VIDEO_HEIGHT}:{VIDEO_CRF}:"
+                    f"{VIDEO_MAX_BITRATE}:{Image is not None}:{FFMPEG is not None}")
+
+
+def media_cache_dir():
+    """Return the processed media cache folder (same folder as the saved posts file)."""
+    return data_path(MEDIA_CACHE_DIR)
+
+
+def content_hash(path):
+    """Hash a file's content together with the pipeline settings."""
+    digest = blake2b(PIPELINE_VERSION.encode(), digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cached(cache_dir, key):
+    """Return the cached output for a key, or None."""
+    for suffix in ('.jpg', '.png', '.mp4', '.keep'):
+        candidate = cache_dir / f"{key}{suffix}"
+        if candidate.exists():
+            try:
+                os.utime(candidate)  # Mark as recently used for pruning
+            except OSError:
+                pass
+            return candidate
+    return None
+
+
+def _run_ffmpeg(args, output):
+    """Run ffmpeg writing to a temporary file, then move it into place."""
+    partial = output.with_name(output.stem + '.part' + output.suffix)
+    result = subprocess.run([FFMPEG, '-y', '-v', 'error'] + args + [str(partial)],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        partial.unlink(missing_ok=True)
+        raise RuntimeError(result.stderr.strip() or "ffmpeg failed")
+    os.replace(partial, output)
+
+
+def _process_image(source, cache_dir, key):
+    """Downscale/recompress an image. Returns the output path or None to keep the source."""
+    with Image.open(source) as img:
+        if getattr(img, 'is_animated', False):
+            return _process_gif(source, cache_dir, key) if FFMPEG else None
+
+        too_big = max(img.size) > MAX_IMAGE_EDGE or os.path.getsize(source) > MAX_IMAGE_BYTES
+        # Other formats (e.g. WebP previews behind a .jpg name) get a JPEG/PNG re-encode
+        if not too_big and img.format in ('JPEG', 'PNG'):
+            return None
+
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((MAX_IMAGE_EDGE, MAX_IMAGE_EDGE), Image.LANCZOS)
+        has_alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+        output = cache_dir / f"{key}{'.png' if has_alpha else '.jpg'}"
+        partial = output.with_name(output.stem + '.part' + output.suffix)
+        if has_alpha:
+            img.save(partial, 'PNG', optimize=True)
+        else:
+            img.convert('RGB').save(partial, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    os.replace(partial, output)
+    return output
+
+
+def _process_gif(source, cache_dir, key):
+    """Convert a GIF to an H.264 MP4 (much smaller, and X turns GIFs into video anyway)."""
+    output = cache_dir / f"{key}.mp4"
+    _run_ffmpeg(['-i', str(source), '-movflags', '+faststart', '-pix_fmt', 'yuv420p', '-an',
+                 '-vf', 'scale=trunc(iw/2)*2:trunc(ih/2)*2', '-c:v', 'libx264', '-crf', str(VIDEO_CRF)],
+                output)
+    return output
+
+
+def _process_video(source, cache_dir, key):
+    """Transcode a large video to an X-friendly H.264/AAC MP4."""
+    if source.suffix.lower() == '.mp4' and os.path.getsize(source) <= VIDEO_TRANSCODE_ABOVE_BYTES:
+        return None
+    output = cache_dir / f"{key}.mp4"
+    _run_ffmpeg(['-i', str(source), '-movflags', '+faststart', '-pix_fmt', 'yuv420p',
+                 '-vf', f"scale=-2:'min({MAX_VIDEO_HEIGHT},ih)'",
+                 '-c:v', 'libx264', '-preset', 'veryfast', '-crf', str(VIDEO_CRF),
+                 '-maxrate', VIDEO_MAX_BITRATE, '-bufsize', '10M', '-c:a', 'aac', '-b:a', '128k'],
+                output)
+    return output
+
+
+def preprocess_file(path, cache_dir, key):
+    """Process one file into the cache (runs in a worker thread).
+
+    Returns:
+        str: Path to upload (the processed file, or the original if nothing
+        was gained or the tools are missing)
+    """
+    source = Path(path)
+    cache_dir = Path(cache_dir)
+    suffix = source.suffix.lower()
+    try:
+        if suffix == '.gif' and Image is None:
+            output = _process_gif(source, cache_dir, key) if FFMPEG else None
+        elif suffix in VIDEO_EXTENSIONS:
+            output = _process_video(source, cache_dir, key) if FFMPEG else None
+        elif Image is not None:
+            output = _process_image(source, cache_dir, key)
+        else:
+            output = None
+    except Exception as e:
+        print(f"  ⚠️  Could not preprocess {source.name}: {e}", flush=True)
+        return str(source)
+
+    # Only keep the result if it is actually smaller
+    if output is not None and output.stat().st_size >= source.stat().st_size:
+        output.unlink()
+        output = None
+    if output is None:
+        # Remember that this content needs no work
+        (cache_dir / f"{key}.keep").touch()
+        return str(source)
+    return str(output)
+
+
+def preprocess_media(paths, workers=DEFAULT_WORKERS, cache_dir=None):
+    """Prepare downloaded media for upload.
+
+    Args:
+        paths: Downloaded file paths
+        workers: Worker threads for cache misses
+        cache_dir: Optional cache folder (defaults to media_cache_dir())
+
+    Returns:
+        list: Paths to upload, in the same order
+    """
+    cache_dir = Path(cache_dir) if cache_dir else media_cache_dir()
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    results = list(paths)
+    misses = []
+    for i, path in enumerate(paths):
+        key = content_hash(path)
+        cached = _cached(cache_dir, key)
+        if cached is None:
+            misses.append((i, key))
+        elif cached.suffix != '.keep':
+            results[i] = str(cached)
+
+    if misses:
+        args = [(paths[i], str(cache_dir), key) for i, key in misses]
+        if len(misses) > 1 and workers > 1:
+            with ThreadPoolExecutor(max_workers=min(workers, len(misses))) as pool:
+                outputs = list(pool.map(preprocess_file, *zip(*args)))
+        else:
+            outputs = [preprocess_file(*arg) for arg in args]
+        for (i, _), output in zip(misses, outputs):
+            results[i] = output
+
+    before = sum(os.path.getsize(p) for p in paths)
+    after = sum(os.path.getsize(p) for p in results)
+    if after < before:
+        print(f"🗜️  Preprocessed media: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB "
+              f"({len(paths) - len(misses)} cached)", flush=True)
+    return results
+
+
+def prune_media_cache(cache_dir=None, max_bytes=CACHE_MAX_BYTES, max_age_days=CACHE_MAX_AGE_DAYS):
+    """Delete cache entries unused for max_age_days, then the least recently used above max_bytes.
+
+    Args:
+        cache_dir: Optional cache folder (defaults to media_cache_dir())
+        max_bytes: Size cap for the whole cache (None = no cap)
+        max_age_days: Age cap by last use (None = no cap)
+
+    Returns:
+        int: Number of files deleted
+    """
+    cache_dir = Path(cache_dir) if cache_dir else media_cache_dir()
+    if not cache_dir.is_dir():
+        return 0
+
+    entries = []
+    for entry in os.scandir(cache_dir):
+        try:
+            if entry.is_file(follow_symlinks=False):
+                stat = entry.stat(follow_symlinks=False)
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            continue
+    entries.sort()  # Least recently used first
+
+    cutoff = time.time() - max_age_days * 86400 if max_age_days else None
+    total = sum(size for _, size, _ in entries)
+    removed = freed = 0
+    for mtime, size, path in entries:
+        # Leftover .part files are from interrupted runs
+        stale = (cutoff and mtime < cutoff) or '.part' in os.path.basename(path)
+        if not stale and (max_bytes is None or total <= max_bytes):
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        freed += size
+        removed += 1
+
+    if removed:
+        print(f"🧹 Pruned {removed} files ({freed / 1e6:.1f} MB) from {cache_dir.name}")
+    return removed
@@ -8,15 +8,15 @@ import re
 from pathlib import Path
 from datetime import datetime
 
+from post_index import dedup_urls
+from posted_filter import PostedScreen
+
 def extract_urls_from_html(html_file):
     """Extract post URLs from Reddit HTML export file."""
     
     with open(html_file, 'r', encoding='utf-8') as f:
         html_content = f.read()
     
-    urls = []
-    seen = set()
-    
     # Debug: Show a sample of the HTML
     print("=== Debugging HTML content ===")
     if "THREAD" in html_content:
@@ -53,17 +53,15 @@ def extract_urls_from_html(html_file):
     # Use whichever found results
     all_matches = matches1 if matches1 else matches2
     
-    for match in all_matches:
-        # Clean up the URL
+    def clean(match):
+        # Strip query string, fragment and trailing slash
         url = match.split('?')[0].split('#')[0]
         if url.endswith('/'):
             url = url[:-1]
-        
-        if url not in seen:
-            seen.add(url)
-            urls.append(url)
+        return url
     
-    return urls
+    # Dedup by integer post ID rather than a set of full URL strings
+    return dedup_urls(clean(match) for match in all_matches)
 
 def main():
     # Look for the export file
@@ -86,6 +84,12 @@ def main():
         
         print(f"✅ Found {len(urls)} saved posts!")
         
+        # Drop anything already in the posted archive
+        unposted = PostedScreen().drop_posted(urls)
+        if len(unposted) < len(urls):
+            print(f"🧹 Dropped {len(urls) - len(unposted)} already-posted URLs")
+        urls = unposted
+        
         # Create JSON file
         output_file = Path.home() / "Downloads" / "reddit_saved_posts.json"
         
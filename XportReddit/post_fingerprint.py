@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Local fingerprint index of everything already posted to X
+
+Each posted thread is stored as a normalised title hash plus a perceptual
+difference hash (dHash) of every uploaded image. Before the composer is
+opened, a post whose title and media match a previous post is reported as a
+likely duplicate, instead of finding out from X's "Already said that" after
+typing and uploading everything.
+
+The index is a JSON Lines file next to the saved posts file. It is built on
+first use from the posted archive (titles recorded by add_to_posted_urls,
+or from the post metadata cache for older entries); media hashes are added
+as posts go out. dHashes need Pillow; without it only titles are compared.
+"""
+
+import json
+import re
+import unicodedata
+from datetime import datetime
+from hashlib import blake2b
+from pathlib import Path
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional
+    Image = None
+
+from data_paths import data_path
+from post_index import extract_post_id
+from post_metadata import load_metadata_cache
+from posted_filter import posted_archive_path
+
+FINGERPRINT_FILE = "reddit_post_fingerprints.jsonl"
+
+DHASH_MAX_DISTANCE = 6            # Hamming distance (of 64 bits) still counted as the same image
+DHASH_MIN_DETAIL = 16             # Set (and unset) bits a dHash needs to identify an image on its own
+POSTED_STATUSES = ('success', 'manual')
+NON_WORD_PATTERN = re.compile(r'[\W_]+', re.UNICODE)
+URL_PATTERN = re.compile(r'https?://\S+')
+
+
+def fingerprint_path():
+    """Return the fingerprint index path (same folder as the saved posts file)."""
+    return data_path(FINGERPRINT_FILE)
+
+
+def normalise_title(title):
+    """Casefold, drop URLs, punctuation and repeated whitespace."""
+    title = unicodedata.normalize('NFKC', title or '')
+    title = URL_PATTERN.sub(' ', title).casefold()
+    return ' '.join(NON_WORD_PATTERN.sub(' ', title).split())
+
+
+def title_hash(title):
+    """Return a short hash of the normalised title (None for empty titles)."""
+    normalised = normalise_title(title)
+    if not normalised:
+        return None
+    return blake2b(normalised.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def dhash(path):
+    """Return the 64-bit difference hash of an image, or None.
+
+    Videos, unreadable files and a missing Pillow all give None.
+    """
+    if Image is None:
+        return None
+    try:
+        with Image.open(path) as img:
+            # First frame only for animated images
+            small = img.convert('L').resize((9, 8), Image.LANCZOS)
+    except Exception:
+        return None
+    pixels = list(small.getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            bits = (bits << 1) | (left > right)
+    return bits
+
+
+def media_hashes(paths):
+    """dHash every file that can be hashed."""
+    return [h for h in (dhash(p) for p in paths) if h is not None]
+
+
+def _distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+def is_distinctive(h):
+    """Whether a dHash carries enough detail to identify an image.
+
+    Low-detail images (text on a plain background, flat colours) have
+    nearly all-zero or all-one hashes that sit a few bits from each other
+    even when the images are unrelated.
+    """
+    set_bits = bin(h).count('1')
+    return DHASH_MIN_DETAIL <= set_bits <= 64 - DHASH_MIN_DETAIL
+
+
+class FingerprintIndex:
+    """In-memory view of the fingerprint file."""
+
+    def __init__(self, records=None, path=None):
+        self.path = Path(path) if path else fingerprint_path()
+        self.by_title = {}   # title hash -> list of records
+        self.records = []
+        for record in records or []:
+            self._add(record)
+
+    def _add(self, record):
+        self.records.append(record)
+        if record.get('title_hash'):
+            self.by_title.setdefault(record['title_hash'], []).append(record)
+
+    @classmethod
+    def load(cls, path=None):
+        """Load the index, building it from the posted archive if it doesn't exist yet."""
+        path = Path(path) if path else fingerprint_path()
+        if not path.exists():
+            return build_fingerprint_index(path)
+        records = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue  # Half-written last line
+        return cls(records, path)
+
+    def find_duplicate(self, title, hashes):
+        """Look for a previous post this one would duplicate.
+
+        A post is a 'likely' duplicate if it has the same normalised title and
+        at least one matching distinctive image, or if every one of its images
+        is distinctive and matches images of a single previous post. Anything
+        weaker is only a 'possible' duplicate, so callers shouldn't skip on it
+        unattended: the same title alone (common titles repeat, and the earlier
+        post may have no recorded media), or matches that rely on low-detail
+        images such as text screenshots, whose hashes collide.
+
+        Args:
+            title: Title that will be posted
+            hashes: dHashes of the media to upload
+
+        Returns:
+            tuple: (matching record, 'likely' or 'possible'), or (None, None)
+        """
+        def matching(record, candidates):
+            return [h for h in candidates
+                    if any(_distance(h, int(other, 16)) <= DHASH_MAX_DISTANCE
+                           for other in record.get('media', []))]
+
+        distinctive = [h for h in hashes if is_distinctive(h)]
+        title_matches = self.by_title.get(title_hash(title), [])
+        for record in title_matches:
+            if distinctive and record.get('media') and matching(record, distinctive):
+                return record, 'likely'
+        if hashes:
+            weak_match = None
+            for record in self.records:
+                if not record.get('media') or len(matching(record, hashes)) < len(hashes):
+                    continue
+                if len(distinctive) == len(hashes):
+                    return record, 'likely'
+                weak_match = weak_match or record
+            if weak_match:
+                return weak_match, 'possible'
+        if title_matches:
+            return title_matches[0], 'possible'
+        return None, None
+
+    def add(self, url, title, hashes):
+        """Append a posted thread to the index and the file."""
+        record = {
+            'url': url,
+            'id': extract_post_id(url),
+            'title_hash': title_hash(title),
+            'media': [f"{h:016x}" for h in hashes],
+            'posted_at': datetime.now().isoformat(),
+        }
+        self._add(record)
+        try:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+        except OSError as e:
+            print(f"⚠️  Warning: Could not update fingerprint index: {e}")
+        return record
+
+
+def build_fingerprint_index(path=None, archive_file=None):
+    """Build the index from the posted archive (titles only) and save it.
+
+    Titles come from archive entries, or from the post metadata cache for
+    entries archived before titles were recorded.
+
+    Returns:
+        FingerprintIndex: The built index
+    """
+    path = Path(path) if path else fingerprint_path()
+    archive_file = Path(archive_file) if archive_file else posted_archive_path()
+    try:
+        with open(archive_file, 'r', encoding='utf-8') as f:
+            entries = json.load(f).get('urls', [])
+    except (OSError, ValueError):
+        entries = []
+
+    cache = load_metadata_cache()
+    records = []
+    for entry in entries:
+        if not isinstance(entry, dict) or entry.get('status') not in POSTED_STATUSES:
+            continue
+        post_id = extract_post_id(entry['url'])
+        title = entry.get('title') or (cache.get(post_id) or {}).get('title')
+        if not title:
+            continue
+        records.append({'url': entry['url'], 'id': post_id, 'title_hash': title_hash(title),
+                        'media': [], 'posted_at': entry.get('posted_at')})
+
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+    except OSError as e:
+        print(f"⚠️  Warning: Could not save fingerprint index: {e}")
+    print(f"🧬 Built fingerprint index from {len(records)} posted entries")
+    return FingerprintIndex(records, path)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Compact integer-keyed index of Reddit post URLs
+
+Reddit post IDs are base-36 strings (e.g. "1abc2d"), so every post can be
+keyed by a single unsigned 64-bit integer. The index keeps those keys in a
+sorted array('Q') with a parallel offset table into one UTF-8 blob holding
+all URLs, instead of lists and sets of Python str objects.
+"""
+
+import json
+import re
+from array import array
+from bisect import bisect_left
+
+POST_ID_PATTERN = re.compile(r'/comments/([a-z0-9]+)(?:/|$)')
+
+# Key used for URLs with no parseable post ID (sorted first, like before)
+NO_ID = 0
+
+
+def extract_post_id(url):
+    """Extract the base-36 post ID from a Reddit URL.
+
+    Args:
+        url: Reddit post URL
+
+    Returns:
+        str: Post ID, or None if the URL has no /comments/<id> segment
+    """
+    match = POST_ID_PATTERN.search(url)
+    if match:
+        return match.group(1)
+    return None
+
+
+def post_key(url):
+    """Convert a Reddit URL to its 64-bit integer key.
+
+    Args:
+        url: Reddit post URL
+
+    Returns:
+        int: Post ID as an integer, or NO_ID if it cannot be parsed
+    """
+    post_id = extract_post_id(url)
+    if not post_id:
+        return NO_ID
+    try:
+        key = int(post_id, 36)
+    except ValueError:
+        return NO_ID
+    # Keys must fit in array('Q'); anything larger is not a real post ID
+    return key if key < 2 ** 64 else NO_ID
+
+
+def key_to_post_id(key):
+    """Convert an integer key back to its base-36 post ID (None for NO_ID)."""
+    if key == NO_ID:
+        return None
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    chars = []
+    while key:
+        key, remainder = divmod(key, 36)
+        chars.append(digits[remainder])
+    return ''.join(reversed(chars))
+
+
+def dedup_urls(urls):
+    """Drop duplicate posts while keeping first-seen order.
+
+    Posts are compared by integer key, so the same post reached through
+    different URL spellings is only kept once. URLs without an ID are
+    compared as plain strings.
+
+    Args:
+        urls: Iterable of Reddit post URLs
+
+    Returns:
+        list: URLs with duplicates removed
+    """
+    seen_keys = set()
+    seen_unkeyed = set()
+    result = []
+    for url in urls:
+        key = post_key(url)
+        if key == NO_ID:
+            if url in seen_unkeyed:
+                continue
+            seen_unkeyed.add(url)
+        else:
+            if key in seen_keys:
+                continue
+            seen_keys.add(key)
+        result.append(url)
+    return result
+
+
+class PostIndex:
+    """Sorted index of post URLs keyed by integer post ID.
+
+    Attributes:
+        keys: array('Q') of post keys in ascending order (oldest first)
+        offsets: array('Q') of len(keys) + 1 byte offsets into blob
+        blob: UTF-8 bytes of all URLs concatenated in key order
+    """
+
+    def __init__(self, keys, offsets, blob):
+        self.keys = keys
+        self.offsets = offsets
+        self.blob = blob
+
+    @classmethod
+    def from_urls(cls, urls, dedup=True):
+        """Build an index from an iterable of URLs.
+
+        With dedup, duplicate keys keep the first URL seen (URLs with no ID
+        are compared as strings); without it every URL is kept, and
+        duplicates stay in their input order. URLs with no ID sort before
+        everything else, in their original order.
+
+        Args:
+            urls: Iterable of Reddit post URLs
+            dedup: Drop duplicate posts
+
+        Returns:
+            PostIndex: The built index
+        """
+        unique = dedup_urls(urls) if dedup else list(urls)
+        keys = array('Q', (post_key(url) for url in unique))
+
+        # Stable sort of positions by key keeps unkeyed URLs in input order
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+
+        sorted_keys = array('Q', (keys[i] for i in order))
+        offsets = array('Q', [0])
+        parts = []
+        position = 0
+        for i in order:
+            encoded = unique[i].encode('utf-8')
+            parts.append(encoded)
+            position += len(encoded)
+            offsets.append(position)
+        return cls(sorted_keys, offsets, b''.join(parts))
+
+    @classmethod
+    def from_posted_archive(cls, json_file):
+        """Build an index from a reddit_posted_urls.json archive.
+
+        Args:
+            json_file: Path to the posted URLs archive
+
+        Returns:
+            PostIndex: Index of every archived URL (empty if the file is missing)
+        """
+        try:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                posted_data = json.load(f)
+        except (OSError, ValueError):
+            return cls.from_urls([])
+
+        entries = posted_data.get('urls', [])
+        return cls.from_urls(
+            entry['url'] if isinstance(entry, dict) else entry
+            for entry in entries
+        )
+
+    def __len__(self):
+        return len(self.keys)
+
+    def url_at(self, position):
+        """Return the URL stored at a sorted position."""
+        start = self.offsets[position]
+        end = self.offsets[position + 1]
+        return self.blob[start:end].decode('utf-8')
+
+    def urls(self, start=0, stop=None):
+        """Return URLs in key order (oldest first) for a slice of positions."""
+        if stop is None:
+            stop = len(self.keys)
+        return [self.url_at(i) for i in range(start, min(stop, len(self.keys)))]
+
+    def contains_key(self, key):
+        """Check whether a post key is in the index (binary search)."""
+        if key == NO_ID:
+            return False
+        i = bisect_left(self.keys, key)
+        return i < len(self.keys) and self.keys[i] == key
+
+    def __contains__(self, url):
+        key = post_key(url)
+        if key != NO_ID:
+            return self.contains_key(key)
+        # Unkeyed URLs are few; a linear scan over them is cheap
+        i = 0
+        while i < len(self.keys) and self.keys[i] == NO_ID:
+            if self.url_at(i) == url:
+                return True
+            i += 1
+        return False
+
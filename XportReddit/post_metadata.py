@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Local cache of Reddit post metadata
+
+Every time a post's JSON is fetched, a small summary (creation time,
+subreddit, media count, estimated upload size) is appended to a JSON Lines
+file. Ordering and scheduling tools read this cache instead of re-fetching
+posts from Reddit. Superseded lines are dropped when the cache is loaded.
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+
+from data_paths import data_path
+
+METADATA_CACHE_FILE = "reddit_post_metadata.jsonl"  # Appended to, compacted on load
+
+# Rough size estimates used when Reddit doesn't tell us enough
+DEFAULT_IMAGE_BYTES = 500_000
+DEFAULT_VIDEO_BYTES = 8_000_000
+IMAGE_BYTES_PER_PIXEL = 0.35   # Typical JPEG at Reddit's quality settings
+
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.webm', '.mkv', '.flv', '.gif')
+SUBREDDIT_PATTERN = re.compile(r'/r/([^/]+)/')
+
+
+def metadata_cache_path():
+    """Return the metadata cache path (same folder as the saved posts file)."""
+    return data_path(METADATA_CACHE_FILE)
+
+
+def subreddit_from_url(url):
+    """Extract the subreddit name from a Reddit URL, or None."""
+    match = SUBREDDIT_PATTERN.search(url)
+    return match.group(1).lower() if match else None
+
+
+def is_video_url(url):
+    """Check whether a media URL points at a video or GIF."""
+    path = url.split('?')[0].lower()
+    return path.endswith(VIDEO_EXTENSIONS) or 'v.redd.it' in path
+
+
+def estimate_media_bytes(post, media_urls):
+    """Estimate the total upload size of a post's media.
+
+    Args:
+        post: Reddit post data dict (data[0]['data']['children'][0]['data'])
+        media_urls: Media URLs chosen for the post
+
+    Returns:
+        int: Estimated bytes
+    """
+    total = 0
+    reddit_video = (post.get('media') or {}).get('reddit_video') \
+        or (post.get('preview') or {}).get('reddit_video_preview')
+    media_metadata = post.get('media_metadata') or {}
+    source_sizes = [
+        img.get('source', {}) for img in (post.get('preview') or {}).get('images', [])
+    ]
+
+    for i, url in enumerate(media_urls):
+        if is_video_url(url):
+            if reddit_video and reddit_video.get('duration') and reddit_video.get('bitrate_kbps'):
+                total += int(reddit_video['duration'] * reddit_video['bitrate_kbps'] * 125)
+            else:
+                total += DEFAULT_VIDEO_BYTES
+            continue
+
+        width = height = None
+        if post.get('is_gallery'):
+            items = (post.get('gallery_data') or {}).get('items', [])
+            if i < len(items):
+                s = media_metadata.get(items[i].get('media_id'), {}).get('s', {})
+                width, height = s.get('x'), s.get('y')
+        elif i < len(source_sizes):
+            width, height = source_sizes[i].get('width'), source_sizes[i].get('height')
+
+        if width and height:
+            total += int(width * height * IMAGE_BYTES_PER_PIXEL)
+        else:
+            total += DEFAULT_IMAGE_BYTES
+    return total
+
+
+def summarise_post(post, media_urls):
+    """Build the cache record for a fetched post.
+
+    Args:
+        post: Reddit post data dict
+        media_urls: Media URLs extracted from the post
+
+    Returns:
+        dict: Metadata record
+    """
+    video_count = sum(1 for url in media_urls if is_video_url(url))
+    return {
+        'id': post.get('id'),
+        'title': post.get('title'),
+        'subreddit': (post.get('subreddit') or '').lower() or None,
+        'created_utc': post.get('created_utc'),
+        'post_hint': post.get('post_hint'),
+        'media_count': len(media_urls),
+        'video_count': video_count,
+        'est_bytes': estimate_media_bytes(post, media_urls),
+        'fetched_at': datetime.now().isoformat(),
+    }
+
+
+def load_metadata_cache(json_file=None, compact=True):
+    """Load the metadata cache.
+
+    The last line for a post wins outright, so a re-fetch replaces every
+    field of the older record (including a stale liveness verdict).
+
+    Args:
+        json_file: Optional cache path (defaults to metadata_cache_path())
+        compact: Rewrite the file with one line per post if it holds
+            superseded or broken lines
+
+    Returns:
+        dict: Post ID (base-36 str) -> metadata record
+    """
+    json_file = Path(json_file) if json_file else metadata_cache_path()
+    cache = {}
+    if not json_file.exists():
+        return cache
+
+    lines = 0
+    with open(json_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            lines += 1
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Partially written line from an interrupted run
+                continue
+            post_id = record.get('id')
+            if post_id:
+                cache[post_id] = record
+
+    if compact and lines > len(cache):
+        _rewrite_cache(json_file, cache)
+    return cache
+
+
+def _rewrite_cache(json_file, cache):
+    """Replace the cache file with one line per post (atomically)."""
+    partial = json_file.with_name(json_file.name + '.tmp')
+    try:
+        with open(partial, 'w', encoding='utf-8') as f:
+            for record in cache.values():
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        os.replace(partial, json_file)
+    except OSError as e:
+        print(f"⚠️  Warning: Could not compact metadata cache: {e}")
+
+
+def record_post_metadata(record, json_file=None):
+    """Append a metadata record to the cache.
+
+    Args:
+        record: Dict with at least an 'id' key
+        json_file: Optional cache path (defaults to metadata_cache_path())
+
+    Returns:
+        bool: True if the record was written
+    """
+    json_file = Path(json_file) if json_file else metadata_cache_path()
+    try:
+        with open(json_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        return True
+    except Exception as e:
+        print(f"⚠️  Warning: Could not update metadata cache: {e}")
+        return False
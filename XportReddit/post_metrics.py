@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Lightweight stage timing for the XportReddit posting loop
+
+Stages are wrapped with the @timed decorator (or the stage_timer context
+manager). Every call is:
+
+- appended to a JSON Lines trace (one event per stage call, tagged with the
+  post being processed), and
+- aggregated into counters and a latency histogram per stage, written as a
+  Prometheus textfile (node_exporter textfile collector format) after each
+  post.
+
+Outcomes are 'ok', 'false' (the stage returned False, i.e. reported failure)
+or 'error' (it raised). Nested stages (e.g. wait_for_upload_completion inside
+upload_images_selenium) are timed independently, so stage totals can
+overlap.
+
+Point-in-time readings (e.g. browser memory between posts) are recorded
+with record_sample and exported as gauges.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from data_paths import data_path
+
+METRICS_TEXTFILE = "xportreddit_metrics.prom"
+TRACE_FILE = "xportreddit_trace.jsonl"
+METRIC_PREFIX = "xportreddit"
+HISTOGRAM_BUCKETS = (0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300)
+
+
+class _StageStats:
+    __slots__ = ('outcomes', 'seconds', 'buckets')
+
+    def __init__(self):
+        self.outcomes = {}                          # outcome -> count
+        self.seconds = 0.0
+        self.buckets = [0] * len(HISTOGRAM_BUCKETS)  # Per-bucket counts, made cumulative on export
+
+
+class Metrics:
+    """Stage timers and counters with JSONL and Prometheus exports."""
+
+    def __init__(self, enabled=True, textfile=None, trace_file=None):
+        self.enabled = enabled
+        self.textfile = textfile
+        self.trace_file = trace_file
+        self.stages = {}
+        self.post_outcomes = {}
+        self.gauges = {}                            # "<kind>_<name>" -> last value
+        self.current_post = None
+        self._post_started = None
+        self._post_counters = {}
+        self._trace = None
+        self._lock = threading.Lock()
+
+    def configure(self, enabled=None, textfile=None, trace_file=None):
+        """Change settings before the first event (paths default to data_path())."""
+        if enabled is not None:
+            self.enabled = enabled
+        if textfile:
+            self.textfile = textfile
+        if trace_file:
+            self.trace_file = trace_file
+
+    def _write_event(self, event):
+        if self._trace is None:
+            path = self.trace_file or data_path(TRACE_FILE)
+            self._trace = open(path, 'a', encoding='utf-8', buffering=1)
+        self._trace.write(json.dumps(event, ensure_ascii=False) + '\n')
+
+    def observe(self, stage, seconds, outcome='ok'):
+        """Record one completed stage call."""
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = _StageStats()
+            stats.outcomes[outcome] = stats.outcomes.get(outcome, 0) + 1
+            stats.seconds += seconds
+            for i, bound in enumerate(HISTOGRAM_BUCKETS):
+                if seconds <= bound:
+                    stats.buckets[i] += 1
+                    break
+            try:
+                self._write_event({'ts': datetime.now().isoformat(), 'post': self.current_post,
+                                   'stage': stage, 'seconds': round(seconds, 4), 'outcome': outcome})
+            except OSError:
+                pass  # Metrics must never break posting
+
+    def record_sample(self, kind, values):
+        """Record a set of readings, e.g. record_sample('browser', {'dom_nodes': 5120})."""
+        if not self.enabled or not values:
+            return
+        with self._lock:
+            for name, value in values.items():
+                self.gauges[f"{kind}_{name}"] = value
+            try:
+                self._write_event({'ts': datetime.now().isoformat(), 'post': self.current_post,
+                                   'sample': kind, **values})
+            except OSError:
+                pass
+
+    @contextmanager
+    def stage_timer(self, stage):
+        """Time a block: `with stage_timer('compose'): ...`"""
+        started = time.perf_counter()
+        outcome = 'ok'
+        try:
+            yield
+        except BaseException:
+            outcome = 'error'
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - started, outcome)
+
+    def timed(self, stage=None):
+        """Decorator timing every call of a function (stage defaults to its name)."""
+        def decorate(func):
+            name = stage or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                started = time.perf_counter()
+                outcome = 'error'
+                try:
+                    result = func(*args, **kwargs)
+                    outcome = 'false' if result is False else 'ok'
+                    return result
+                finally:
+                    self.observe(name, time.perf_counter() - started, outcome)
+            return wrapper
+        return decorate
+
+    def begin_post(self, url, **counters):
+        """Tag following events with a post URL and start its wall-clock timer.
+
+        Counters (e.g. processed=3, failed=1) are snapshotted so end_post can
+        tell which one the post moved.
+        """
+        self.current_post = url
+        self._post_started = time.perf_counter()
+        self._post_counters = counters
+
+    def end_post(self, outcome=None, **counters):
+        """Record the whole post and export.
+
+        The outcome is given, or else the name of the first counter that went
+        up since begin_post ('none' if nothing changed).
+        """
+        if self._post_started is not None:
+            if outcome is None:
+                outcome = next((name for name, value in counters.items()
+                                if value > self._post_counters.get(name, value)), 'none')
+            self.observe('post', time.perf_counter() - self._post_started, outcome)
+            self.post_outcomes[outcome] = self.post_outcomes.get(outcome, 0) + 1
+        self.current_post = None
+        self._post_started = None
+        self.write_textfile()
+
+    def write_textfile(self):
+        """Write all metrics in Prometheus text format (atomically)."""
+        if not self.enabled or not self.stages:
+            return
+        p = METRIC_PREFIX
+        lines = [
+            f"# HELP {p}_stage_calls_total Stage calls by outcome.",
+            f"# TYPE {p}_stage_calls_total counter",
+        ]
+        with self._lock:
+            stages = sorted(self.stages.items())
+            for stage, stats in stages:
+                for outcome, count in sorted(stats.outcomes.items()):
+                    lines.append(f'{p}_stage_calls_total{{stage="{stage}",outcome="{outcome}"}} {count}')
+
+            lines += [f"# HELP {p}_stage_seconds Stage wall-clock time.",
+                      f"# TYPE {p}_stage_seconds histogram"]
+            for stage, stats in stages:
+                cumulative = 0
+                for bound, count in zip(HISTOGRAM_BUCKETS, stats.buckets):
+                    cumulative += count
+                    lines.append(f'{p}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                total = sum(stats.outcomes.values())
+                lines.append(f'{p}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {total}')
+                lines.append(f'{p}_stage_seconds_sum{{stage="{stage}"}} {stats.seconds:.4f}')
+                lines.append(f'{p}_stage_seconds_count{{stage="{stage}"}} {total}')
+
+            lines += [f"# HELP {p}_posts_total Posts handled by outcome.",
+                      f"# TYPE {p}_posts_total counter"]
+            for outcome, count in sorted(self.post_outcomes.items()):
+                lines.append(f'{p}_posts_total{{outcome="{outcome}"}} {count}')
+            for name, value in sorted(self.gauges.items()):
+                lines += [f"# TYPE {p}_{name} gauge", f"{p}_{name} {value}"]
+            lines += [f"# HELP {p}_last_export_timestamp_seconds Time of this export.",
+                      f"# TYPE {p}_last_export_timestamp_seconds gauge",
+                      f"{p}_last_export_timestamp_seconds {time.time():.0f}"]
+
+        path = Path(self.textfile or data_path(METRICS_TEXTFILE))
+        partial = path.with_name(path.name + '.tmp')
+        try:
+            partial.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+            os.replace(partial, path)
+        except OSError as e:
+            print(f"⚠️  Warning: Could not write metrics: {e}")
+
+    def summary_lines(self):
+        """Human-readable per-stage totals, slowest first."""
+        rows = sorted(self.stages.items(), key=lambda item: -item[1].seconds)
+        lines = []
+        for stage, stats in rows:
+            calls = sum(stats.outcomes.values())
+            failed = stats.outcomes.get('false', 0) + stats.outcomes.get('error', 0)
+            lines.append(f"   {stage:<28} {calls:>5} calls  {stats.seconds:>8.1f}s total  "
+                         f"{stats.seconds / calls:>6.2f}s avg  {failed} failed")
+        return lines
+
+    def close(self):
+        self.write_textfile()
+        if self._trace:
+            self._trace.close()
+            self._trace = None
+
+
+# Shared instance used by XportReddit's decorators
+METRICS = Metrics()
+timed = METRICS.timed
+stage_timer = METRICS.stage_timer
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Persisted Bloom filter over posted Reddit post IDs
+
+Lets the ingest scripts drop URLs that were already posted without loading
+the whole reddit_posted_urls.json archive. The filter answers "definitely
+not posted" from a few bytes per entry; only possible hits fall back to an
+exact lookup in the archive.
+
+The filter is stored next to the archive (reddit_posted_urls.bloom) and is
+updated in place with each archive write by add_many_to_posted_urls. Its header
+records the archive's size and mtime as of the last update; if the archive
+changed without the filter (a failed update, a restored or hand-edited
+archive), the filter is rebuilt before it is trusted.
+"""
+
+import math
+import struct
+from hashlib import blake2b
+from pathlib import Path
+
+from data_paths import data_path
+from post_index import PostIndex, post_key, NO_ID
+
+POSTED_URLS_FILE = "reddit_posted_urls.json"  # Archive written by XportReddit
+
+FILTER_MAGIC = b'XRB2'
+# magic, hash count, bit count, entries, capacity, archive size, archive mtime (ns)
+FILTER_HEADER = struct.Struct('<4sIQQQQQ')
+DEFAULT_CAPACITY = 10_000
+FALSE_POSITIVE_RATE = 0.01
+
+
+def posted_archive_path():
+    """Return the posted URLs archive path (same logic as add_to_posted_urls)."""
+    return data_path(POSTED_URLS_FILE)
+
+
+def filter_path_for(archive_file):
+    """Return the Bloom filter path that belongs to an archive file."""
+    return Path(archive_file).with_suffix('.bloom')
+
+
+def archive_stamp(archive_file):
+    """Return (size, mtime_ns) of an archive file, or (0, 0) if it doesn't exist."""
+    try:
+        st = Path(archive_file).stat()
+    except OSError:
+        return (0, 0)
+    return (st.st_size, st.st_mtime_ns)
+
+
+class PostedFilter:
+    """Bloom filter keyed by integer post ID."""
+
+    def __init__(self, hash_count, bit_count, capacity, bits=None, count=0, stamp=(0, 0)):
+        self.hash_count = hash_count
+        self.bit_count = bit_count
+        self.capacity = capacity
+        self.count = count
+        self.stamp = stamp  # archive_stamp() of the archive the filter matches
+        self.bits = bits if bits is not None else bytearray((bit_count + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity, false_positive_rate=FALSE_POSITIVE_RATE):
+        """Create an empty filter sized for `capacity` entries."""
+        capacity = max(capacity, DEFAULT_CAPACITY)
+        bit_count = math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+        hash_count = max(1, round(bit_count / capacity * math.log(2)))
+        return cls(hash_count, bit_count, capacity)
+
+    @classmethod
+    def load(cls, filter_file):
+        """Load a filter from disk, or return None if missing or unreadable."""
+        try:
+            with open(filter_file, 'rb') as f:
+                header = f.read(FILTER_HEADER.size)
+                magic, hash_count, bit_count, count, capacity, size, mtime_ns = FILTER_HEADER.unpack(header)
+                bits = bytearray(f.read())
+        except (OSError, struct.error):
+            return None
+        if magic != FILTER_MAGIC or len(bits) != (bit_count + 7) // 8:
+            return None
+        return cls(hash_count, bit_count, capacity, bits, count, (size, mtime_ns))
+
+    def save(self, filter_file):
+        """Write the whole filter to disk."""
+        with open(filter_file, 'wb') as f:
+            f.write(self._header())
+            f.write(self.bits)
+
+    def _header(self):
+        return FILTER_HEADER.pack(FILTER_MAGIC, self.hash_count, self.bit_count,
+                                  self.count, self.capacity, *self.stamp)
+
+    def _positions(self, key):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = blake2b(key.to_bytes(8, 'little'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.bit_count for i in range(self.hash_count)]
+
+    def add_key(self, key):
+        """Add a key.
+
+        Returns:
+            set: Byte offsets (into self.bits) that changed
+        """
+        changed = set()
+        for position in self._positions(key):
+            byte, bit = divmod(position, 8)
+            mask = 1 << bit
+            if not self.bits[byte] & mask:
+                self.bits[byte] |= mask
+                changed.add(byte)
+        if changed:
+            self.count += 1
+        return changed
+
+    def might_contain_key(self, key):
+        """False means definitely not present; True means possibly present."""
+        for position in self._positions(key):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                return False
+        return True
+
+    @property
+    def is_full(self):
+        return self.count > self.capacity
+
+
+def build_posted_filter(archive_file=None):
+    """Rebuild the filter from the posted archive and save it.
+
+    Args:
+        archive_file: Optional archive path (defaults to posted_archive_path())
+
+    Returns:
+        PostedFilter: The rebuilt filter
+    """
+    archive_file = Path(archive_file) if archive_file else posted_archive_path()
+    stamp = archive_stamp(archive_file)
+    index = PostIndex.from_posted_archive(archive_file)
+    # Leave room to grow before the next rebuild
+    posted_filter = PostedFilter.for_capacity(len(index) * 2)
+    posted_filter.stamp = stamp
+    for key in index.keys:
+        if key != NO_ID:
+            posted_filter.add_key(key)
+    posted_filter.save(filter_path_for(archive_file))
+    return posted_filter
+
+
+def update_posted_filter(urls, archive_file, previous_stamp):
+    """Add posted URLs to the persisted filter.
+
+    Only the header and the changed bytes are rewritten. Call this after the
+    URLs have been written to the archive, so a rebuild would include them.
+    If the filter didn't match the archive as it was before that write, it
+    is rebuilt instead.
+
+    Args:
+        urls: Reddit post URLs that were just archived (one write)
+        archive_file: Path to the posted URLs archive
+        previous_stamp: archive_stamp() taken before the URL was written
+
+    Returns:
+        bool: True if the filter is up to date
+    """
+    filter_file = filter_path_for(archive_file)
+    try:
+        posted_filter = PostedFilter.load(filter_file)
+        if posted_filter is None or posted_filter.is_full or posted_filter.stamp != tuple(previous_stamp):
+            build_posted_filter(archive_file)
+            return True
+
+        changed = set()
+        for url in urls:
+            key = post_key(url)
+            # Unkeyed URLs always go through the exact lookup
+            if key != NO_ID:
+                changed |= posted_filter.add_key(key)
+        posted_filter.stamp = archive_stamp(archive_file)
+        with open(filter_file, 'r+b') as f:
+            f.write(posted_filter._header())
+            for byte in sorted(changed):
+                f.seek(FILTER_HEADER.size + byte)
+                f.write(posted_filter.bits[byte:byte + 1])
+        return True
+    except Exception as e:
+        print(f"⚠️  Warning: Could not update posted filter: {e}")
+        return False
+
+
+class PostedScreen:
+    """Answer "was this URL already posted?" with a Bloom filter first.
+
+    The archive is only loaded (once) if the filter reports a possible hit
+    or a URL has no post ID. A filter that is missing or out of step with
+    the archive is rebuilt first.
+    """
+
+    def __init__(self, archive_file=None):
+        self.archive_file = Path(archive_file) if archive_file else posted_archive_path()
+        self._exact = None
+        self.filter = None
+        if self.archive_file.exists():
+            self.filter = PostedFilter.load(filter_path_for(self.archive_file))
+            if self.filter is None:
+                print("🧮 Building posted-URL filter from archive...")
+                self.filter = build_posted_filter(self.archive_file)
+            elif self.filter.stamp != archive_stamp(self.archive_file):
+                print("🧮 Posted archive changed since the filter was updated, rebuilding...")
+                self.filter = build_posted_filter(self.archive_file)
+
+    def _exact_index(self):
+        if self._exact is None:
+            self._exact = PostIndex.from_posted_archive(self.archive_file)
+        return self._exact
+
+    def is_posted(self, url):
+        if self.filter is None:
+            return False
+        key = post_key(url)
+        if key != NO_ID and not self.filter.might_contain_key(key):
+            return False
+        return url in self._exact_index()
+
+    def drop_posted(self, urls):
+        """Return the URLs that have not been posted yet (order preserved)."""
+        return [url for url in urls if not self.is_posted(url)]
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Reddit post fetching and media extraction shared by XportReddit and the
+standalone scanning tools
+
+extract_media_urls returns the source (full-resolution) URL of every media
+item. select_media_urls picks, per item, the smallest rendition Reddit
+already serves that still meets a target resolution and byte budget:
+preview resolutions for images, gallery 'p' arrays, and DASH renditions
+for Reddit-hosted video.
+"""
+
+import re
+import xml.etree.ElementTree as ET
+from urllib.parse import urljoin
+
+import requests
+
+from post_metadata import IMAGE_BYTES_PER_PIXEL
+
+# Variant selection defaults
+TARGET_IMAGE_EDGE = 1080         # Long edge (px) wanted for images; None = always use the source
+TARGET_VIDEO_HEIGHT = 720        # DASH rendition wanted for videos; None = always use the fallback
+IMAGE_BYTE_BUDGET = 5_000_000    # X rejects images over 5 MB
+VIDEO_BYTE_BUDGET = 512_000_000  # X's video upload limit
+
+DASH_RENDITION_PATTERN = re.compile(r'(?:DASH|CMAF)_(\d+)\.mp4')
+MPD_NAMESPACE = {'mpd': 'urn:mpeg:dash:schema:mpd:2011'}
+
+# Use more complete headers to avoid 403 blocks
+REDDIT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+
+def json_endpoint(post_url):
+    """Return the .json endpoint for a Reddit post URL."""
+    if post_url.endswith('.json'):
+        return post_url
+    if post_url.endswith('/'):
+        return post_url + '.json'
+    return post_url + '/.json'
+
+
+def fetch_reddit_post(post_url, session=None, timeout=10):
+    """Fetch a post's data from Reddit's JSON endpoint.
+
+    Args:
+        post_url: Reddit post URL
+        session: Optional requests.Session to reuse connections
+        timeout: Request timeout in seconds
+
+    Returns:
+        dict: Post data (data[0]['data']['children'][0]['data'])
+
+    Raises:
+        requests.exceptions.HTTPError: For 4xx/5xx responses
+    """
+    http = session or requests
+    post_url = json_endpoint(post_url)
+
+    try:
+        resp = http.get(post_url, headers=REDDIT_HEADERS, timeout=timeout)
+        resp.raise_for_status()
+    except requests.exceptions.HTTPError as e:
+        if e.response.status_code == 403 and 'quarantined' not in e.response.text:
+            print(f"\n⚠️  Reddit blocked the request (403). Trying alternative method...")
+            # Try without .json - scrape HTML instead or use old.reddit.com
+            alt_url = post_url.replace('.json', '').replace('www.reddit.com', 'old.reddit.com') + '.json'
+            resp = http.get(alt_url, headers=REDDIT_HEADERS, timeout=timeout)
+            resp.raise_for_status()
+        else:
+            raise
+
+    data = resp.json()
+    return data[0]['data']['children'][0]['data']
+
+
+def _image_candidates(source_url, width, height, renditions):
+    """Build (width, height, url) candidates from a source and its renditions."""
+    candidates = [(width, height, source_url)]
+    for rendition in renditions:
+        # Preview resolutions use width/height/url, gallery 'p' arrays x/y/u
+        w = rendition.get('width', rendition.get('x'))
+        h = rendition.get('height', rendition.get('y'))
+        url = rendition.get('url', rendition.get('u'))
+        if w and h and url:
+            candidates.append((w, h, url.replace('&amp;', '&')))
+    return candidates
+
+
+def _media_items(post):
+    """Yield one (source_url, image_candidates, reddit_video) tuple per media item.
+
+    image_candidates is a list of (width, height, url) including the source
+    (empty if there are no size-known renditions); reddit_video is the video
+    dict for Reddit-hosted video, else None.
+    """
+    # Handle Reddit gallery
+    if post.get('is_gallery'):
+        media_metadata = post.get('media_metadata', {})
+        for item in post.get('gallery_data', {}).get('items', []):
+            media_id = item['media_id']
+            meta = media_metadata.get(media_id, {})
+            if meta.get('status') == 'valid':
+                s = meta.get('s', {})
+                # Try multiple possible keys for the URL
+                img_url = (
+                    s.get('u') or
+                    s.get('gif') or
+                    s.get('mp4') or
+                    s.get('url')
+                )
+                if img_url:
+                    img_url = img_url.replace('&amp;', '&')
+                    # 'p' renditions are stills, so animated items keep their source
+                    animated = not s.get('u')
+                    candidates = [] if animated else _image_candidates(img_url, s.get('x'), s.get('y'), meta.get('p', []))
+                    yield img_url, candidates, None
+    # Handle single image (Reddit-hosted)
+    elif post.get('post_hint') == 'image' and 'url' in post:
+        images = (post.get('preview') or {}).get('images') or [{}]
+        source = images[0].get('source', {})
+        yield post['url'], _image_candidates(post['url'], source.get('width'), source.get('height'),
+                                             images[0].get('resolutions', [])), None
+    # Handle Reddit-hosted video or GIF
+    elif post.get('post_hint') == 'hosted:video' and 'media' in post:
+        reddit_video = post['media'].get('reddit_video')
+        if reddit_video and 'fallback_url' in reddit_video:
+            yield reddit_video['fallback_url'], [], reddit_video
+    # Handle GIFs (as MP4)
+    elif post.get('post_hint') == 'rich:video' and 'preview' in post:
+        if 'reddit_video_preview' in post['preview']:
+            reddit_video = post['preview']['reddit_video_preview']
+            yield reddit_video['fallback_url'], [], reddit_video
+    # Handle preview images (fallback)
+    elif 'preview' in post and 'images' in post['preview']:
+        for img in post['preview']['images']:
+            img_url = img['source']['url'].replace('&amp;', '&')
+            yield img_url, _image_candidates(img_url, img['source'].get('width'), img['source'].get('height'),
+                                             img.get('resolutions', [])), None
+    # Handle Imgur direct links
+    elif 'imgur.com' in post.get('url', ''):
+        url = post['url']
+        if not url.endswith(('.jpg', '.png', '.gif', '.mp4')):
+            url += '.jpg'
+        yield url, [], None
+    # Add more handlers as needed
+
+
+def extract_media_urls(post):
+    """Extract downloadable media URLs from a post.
+
+    Args:
+        post: Reddit post data dict
+
+    Returns:
+        list: Media URLs (images, GIFs and videos)
+    """
+    return [source_url for source_url, _, _ in _media_items(post)]
+
+
+def select_image_variant(candidates, target_edge=TARGET_IMAGE_EDGE, byte_budget=IMAGE_BYTE_BUDGET):
+    """Pick the smallest image rendition whose long edge meets the target.
+
+    If that rendition is estimated to exceed the byte budget, the largest
+    rendition within budget is used instead.
+
+    Args:
+        candidates: (width, height, url) tuples, source first
+        target_edge: Wanted long edge in pixels (None = source)
+        byte_budget: Estimated size limit in bytes
+
+    Returns:
+        str: Chosen URL (the source if nothing better is known)
+    """
+    source_url = candidates[0][2]
+    sized = sorted((c for c in candidates if c[0] and c[1]), key=lambda c: c[0] * c[1])
+    if not target_edge or not sized:
+        return source_url
+
+    # A source smaller than the target counts as meeting it
+    wanted = min(target_edge, max(sized[-1][0], sized[-1][1]))
+    chosen = next(c for c in sized if max(c[0], c[1]) >= wanted)
+    if chosen[0] * chosen[1] * IMAGE_BYTES_PER_PIXEL > byte_budget:
+        within = [c for c in sized if c[0] * c[1] * IMAGE_BYTES_PER_PIXEL <= byte_budget]
+        if within:
+            chosen = within[-1]
+    return chosen[2]
+
+
+def dash_renditions(reddit_video, session=None, timeout=10):
+    """List a Reddit video's DASH video renditions.
+
+    Reads the DASH playlist (one small request) for exact heights and
+    bitrates. Falls back to the renditions implied by fallback_url if the
+    playlist can't be read.
+
+    Returns:
+        list: (height, estimated_bytes or None, url) tuples, smallest first
+    """
+    fallback_url = reddit_video['fallback_url']
+    duration = reddit_video.get('duration') or 0
+    dash_url = reddit_video.get('dash_url')
+    if dash_url:
+        try:
+            resp = (session or requests).get(dash_url.replace('&amp;', '&'), headers=REDDIT_HEADERS, timeout=timeout)
+            resp.raise_for_status()
+            root = ET.fromstring(resp.content)
+            renditions = []
+            for adaptation in root.iterfind('.//mpd:AdaptationSet', MPD_NAMESPACE):
+                for rep in adaptation.iterfind('mpd:Representation', MPD_NAMESPACE):
+                    mime_type = rep.get('mimeType') or adaptation.get('mimeType') or ''
+                    base_url = rep.findtext('mpd:BaseURL', namespaces=MPD_NAMESPACE)
+                    if not mime_type.startswith('video') or not rep.get('height') or not base_url:
+                        continue
+                    bandwidth = int(rep.get('bandwidth', 0))
+                    est_bytes = int(bandwidth / 8 * duration) if bandwidth and duration else None
+                    renditions.append((int(rep.get('height')), est_bytes, urljoin(dash_url, base_url.strip())))
+            if renditions:
+                return sorted(renditions)
+        except (requests.exceptions.RequestException, ET.ParseError, ValueError):
+            pass
+
+    # Only the fallback is known to exist
+    match = DASH_RENDITION_PATTERN.search(fallback_url)
+    height = int(match.group(1)) if match else reddit_video.get('height') or 0
+    est_bytes = int(reddit_video['bitrate_kbps'] * 125 * duration) if reddit_video.get('bitrate_kbps') and duration else None
+    return [(height, est_bytes, fallback_url)]
+
+
+def select_video_variant(reddit_video, target_height=TARGET_VIDEO_HEIGHT, byte_budget=VIDEO_BYTE_BUDGET,
+                         session=None):
+    """Pick the smallest DASH rendition at or above the target height.
+
+    If it is estimated to exceed the byte budget, the largest rendition
+    within budget is used instead.
+
+    Returns:
+        str: Chosen URL (fallback_url if nothing better is known)
+    """
+    if not target_height:
+        return reddit_video['fallback_url']
+    renditions = dash_renditions(reddit_video, session)
+    wanted = min(target_height, renditions[-1][0])
+    chosen = next(r for r in renditions if r[0] >= wanted)
+    if chosen[1] and chosen[1] > byte_budget:
+        within = [r for r in renditions if r[1] and r[1] <= byte_budget]
+        if within:
+            chosen = within[-1]
+    return chosen[2]
+
+
+def select_media_urls(post, target_edge=TARGET_IMAGE_EDGE, target_video_height=TARGET_VIDEO_HEIGHT,
+                      image_byte_budget=IMAGE_BYTE_BUDGET, video_byte_budget=VIDEO_BYTE_BUDGET, session=None):
+    """Like extract_media_urls, but picks bandwidth-friendly renditions.
+
+    Args:
+        post: Reddit post data dict
+        target_edge: Wanted image long edge in pixels (None = sources)
+        target_video_height: Wanted DASH rendition height (None = fallback_url)
+        image_byte_budget: Per-image estimated size limit
+        video_byte_budget: Per-video estimated size limit
+        session: Optional requests.Session for DASH playlist requests
+
+    Returns:
+        list: Media URLs, one per item, in the same order as extract_media_urls
+    """
+    urls = []
+    for source_url, candidates, reddit_video in _media_items(post):
+        if reddit_video:
+            urls.append(select_video_variant(reddit_video, target_video_height, video_byte_budget, session))
+        elif candidates:
+            urls.append(select_image_variant(candidates, target_edge, image_byte_budget))
+        else:
+            urls.append(source_url)
+    return urls
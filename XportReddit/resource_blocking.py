@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Block timeline media and trackers in the X tab via the DevTools protocol
+
+Home, profile and post-publish page loads pull in every image and video
+on the timeline plus third-party trackers, competing with our own uploads.
+Network.setBlockedURLs drops those requests in the browser before they are
+sent. The patterns only cover timeline media hosts and tracker domains, so
+these are never touched:
+
+- x.com / api.x.com (app and API calls)
+- upload.x.com / upload.twitter.com (media uploads)
+- abs.twimg.com (JavaScript and CSS bundles)
+- pbs.twimg.com/profile_images (small avatars)
+
+Blocking is per browser tab (CDP target) and per WebDriver session, so it
+is applied again whenever the driver switches to a tab it hasn't covered
+yet. The covered tabs are remembered on the driver itself: a reconnected
+session starts with none, even for tabs that kept their window handle.
+"""
+
+BLOCKED_URL_PATTERNS = [
+    # Timeline media
+    "*://pbs.twimg.com/media/*",
+    "*://pbs.twimg.com/ext_tw_video_thumb/*",
+    "*://pbs.twimg.com/amplify_video_thumb/*",
+    "*://pbs.twimg.com/tweet_video_thumb/*",
+    "*://pbs.twimg.com/card_img/*",
+    "*://video.twimg.com/*",
+    # Ads and third-party trackers
+    "*://ads-twitter.com/*",
+    "*://*.ads-twitter.com/*",
+    "*://ads-api.x.com/*",
+    "*://analytics.twitter.com/*",
+    "*://*.doubleclick.net/*",
+    "*://*.google-analytics.com/*",
+    "*://*.googletagmanager.com/*",
+    "*://*.scorecardresearch.com/*",
+]
+
+
+
+def _blocked_handles(driver):
+    """Return the set of this driver's tabs (window handles) that have the block list."""
+    handles = getattr(driver, '_xport_blocked_handles', None)
+    if handles is None:
+        handles = driver._xport_blocked_handles = set()
+    return handles
+
+
+def enable_resource_blocking(driver, patterns=None):
+    """Apply the block list to the driver's current tab.
+
+    Args:
+        driver: Chromium-based WebDriver (Edge/Chrome)
+        patterns: URL wildcard patterns (defaults to BLOCKED_URL_PATTERNS)
+
+    Returns:
+        bool: True if blocking is active for this tab
+    """
+    try:
+        handle = driver.current_window_handle
+        if handle in _blocked_handles(driver):
+            return True
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns or BLOCKED_URL_PATTERNS})
+        _blocked_handles(driver).add(handle)
+        return True
+    except Exception as e:
+        print(f"  ⚠️  Could not enable resource blocking: {e}", flush=True)
+        return False
+
+
+def forget_tab(driver, handle):
+    """Drop a closed tab from the driver's bookkeeping."""
+    _blocked_handles(driver).discard(handle)
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Central registry of the X page selectors, with ordered fallbacks
+
+Every element the poster interacts with has a list of CSS selectors, newest
+markup first. A lookup tests all of them in the page with one WebDriver
+round-trip (instead of one find_element or WebDriverWait per selector), and
+a wait polls that single lookup until any selector matches.
+
+The primary (first, most specific) selector always wins when it matches.
+Fallbacks are often broad enough to match elsewhere on the page, so they
+are only used while the primary is missing. Among the fallbacks, the one
+that last found the element is tried first, then the ones that have ever
+worked. Per-selector hit/miss counts are kept in x_selector_stats.json so
+that ranking survives restarts.
+
+Lookups can be scoped to another registered element (e.g. within the
+compose modal), so the inline composer on the timeline is never mistaken
+for the modal's.
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+from selenium.common.exceptions import TimeoutException
+
+from data_paths import data_path
+
+STATS_FILE = "x_selector_stats.json"
+POLL_SECONDS = 0.25
+
+# name -> selectors in preference order (primary first)
+DEFAULT_SELECTORS = {
+    'text_area': [
+        '[data-testid="tweetTextarea_0"]',
+        'div[role="textbox"][contenteditable="true"]',
+    ],
+    'file_input': [
+        'input[data-testid="fileInput"]',
+        'input[type="file"][accept*="image"]',
+    ],
+    'post_button': [
+        '[data-testid="tweetButton"]',        # Modal "Post all" or "Post" button
+        '[data-testid="tweetButtonInline"]',  # Inline composer button
+    ],
+    'add_button': [
+        '[data-testid="addButton"]',
+        'button[aria-label="Add post"]',
+    ],
+    'new_post_button': [
+        'a[data-testid="SideNav_NewTweet_Button"]',
+        'a[href="/compose/post"]',
+    ],
+    'profile_link': [
+        '[data-testid="AppTabBar_Profile_Link"]',
+        'a[aria-label="Profile"]',
+    ],
+    'home_link': [
+        '[data-testid="AppTabBar_Home_Link"]',
+        'a[href="/home"][role="link"]',
+    ],
+    'compose_modal': [
+        '[aria-labelledby="modal-header"]',
+        'div[role="dialog"]',
+    ],
+}
+
+# Returns [index, element] for the first selector (in the given order) with a match,
+# searching inside the first match of the scope selectors if any are given
+LOCATE_SCRIPT = """
+const selectors = arguments[0], visible = arguments[1], scopes = arguments[2];
+let root = document;
+if (scopes) {
+    root = null;
+    for (const scope of scopes) {
+        try { root = document.querySelector(scope); } catch (e) {}
+        if (root) break;
+    }
+    if (!root) return null;
+}
+for (let i = 0; i < selectors.length; i++) {
+    let found;
+    try { found = root.querySelectorAll(selectors[i]); } catch (e) { continue; }
+    for (const el of found) {
+        if (!visible || el.getClientRects().length) return [i, el];
+    }
+}
+return null;
+"""
+
+
+class SelectorRegistry:
+    """Ordered selector fallbacks that learn which one currently works."""
+
+    def __init__(self, selectors=None, path=None):
+        self.selectors = selectors or DEFAULT_SELECTORS
+        self.path = Path(path) if path else None
+        self.stats = None   # name -> {'last': selector, 'timeouts': n, 'selectors': {selector: {...}}}
+        self._dirty = False
+
+    def _load(self):
+        if self.stats is not None:
+            return
+        self.path = self.path or data_path(STATS_FILE)
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.stats = json.load(f)
+        except (OSError, ValueError):
+            self.stats = {}
+
+    def ranked(self, name):
+        """Return an element's selectors in the order they should be tried."""
+        self._load()
+        selectors = self.selectors[name]
+        entry = self.stats.get(name, {})
+        counts = entry.get('selectors', {})
+
+        def rank(item):
+            position, selector = item
+            hits = counts.get(selector, {}).get('hits', 0)
+            return (selector != entry.get('last'), hits == 0, -hits, position)
+
+        # Checking the primary first costs nothing (same round-trip), and it
+        # must win over broad fallbacks whenever it is on the page
+        primary, fallbacks = selectors[0], list(enumerate(selectors))[1:]
+        return [primary] + [s for _, s in sorted(fallbacks, key=rank)]
+
+    def _record(self, name, tried, winner):
+        entry = self.stats.setdefault(name, {'last': None, 'timeouts': 0, 'selectors': {}})
+        for selector in tried:
+            counts = entry['selectors'].setdefault(selector, {'hits': 0, 'misses': 0})
+            if selector == winner:
+                counts['hits'] += 1
+                counts['last_hit'] = datetime.now().isoformat(timespec='seconds')
+                break
+            counts['misses'] += 1
+        if winner is None:
+            entry['timeouts'] += 1
+        self._dirty = True
+        if winner and entry['last'] != winner:
+            entry['last'] = winner
+            self.save()  # Keep the new winner even if the run crashes
+
+    def _locate(self, driver, name, visible, within):
+        tried = self.ranked(name)
+        scopes = self.ranked(within) if within else None
+        result = driver.execute_script(LOCATE_SCRIPT, tried, visible, scopes)
+        if not result:
+            return tried, None, None
+        return tried, tried[result[0]], result[1]
+
+    def locate(self, driver, name, visible=False, within=None):
+        """Find an element with one round-trip, or return None.
+
+        Meant for polling loops, so only hits are counted.
+
+        Args:
+            driver: WebDriver instance
+            name: Registry name (e.g. 'text_area')
+            visible: Only accept elements that are rendered
+            within: Registry name of an element to search inside (e.g. 'compose_modal')
+
+        Returns:
+            WebElement: The element, or None if no selector matched
+        """
+        tried, winner, element = self._locate(driver, name, visible, within)
+        if winner:
+            self._record(name, tried, winner)
+        return element
+
+    def find(self, driver, name, timeout=10, visible=False, within=None):
+        """Wait for any selector of an element to match.
+
+        Args:
+            driver: WebDriver instance
+            name: Registry name (e.g. 'text_area')
+            timeout: Seconds to wait for a match
+            visible: Only accept elements that are rendered
+            within: Registry name of an element to search inside (e.g. 'compose_modal')
+
+        Returns:
+            WebElement: The element
+
+        Raises:
+            TimeoutException: If nothing matched within timeout seconds
+        """
+        end_time = time.time() + timeout
+        while True:
+            tried, winner, element = self._locate(driver, name, visible, within)
+            if winner:
+                self._record(name, tried, winner)
+                return element
+            if time.time() >= end_time:
+                self._record(name, tried, None)
+                raise TimeoutException(f"No selector for '{name}' matched within {timeout}s")
+            time.sleep(POLL_SECONDS)
+
+    def save(self):
+        """Write the hit statistics if they changed (atomically)."""
+        if not self._dirty or self.stats is None:
+            return
+        partial = self.path.with_name(self.path.name + '.tmp')
+        try:
+            partial.write_text(json.dumps(self.stats, indent=2), encoding='utf-8')
+            os.replace(partial, self.path)
+            self._dirty = False
+        except OSError as e:
+            print(f"⚠️  Warning: Could not save selector stats: {e}")
+
+
+# Shared instance used by XportReddit
+SELECTORS = SelectorRegistry()
@@ -1,68 +1,173 @@
 #!/usr/bin/env python3
 """
 Sort Reddit saved posts from oldest to newest based on post ID
+
+Other orderings (creation time, subreddit round-robin, media count, upload
+cost) are computed from the local metadata cache, without re-fetching posts.
 """
 
+import argparse
 import json
-import re
 from pathlib import Path
 from datetime import datetime
 
-def extract_post_id(url):
-    """Extract the post ID from a Reddit URL."""
-    match = re.search(r'/comments/([a-z0-9]+)/', url)
-    if match:
-        return match.group(1)
-    return None
+from post_index import PostIndex, extract_post_id, key_to_post_id, NO_ID
+from tolerant_json import load_json_tolerant
+from posted_filter import PostedScreen
+from post_metadata import (
+    load_metadata_cache, subreddit_from_url,
+    DEFAULT_IMAGE_BYTES,
+)
+
+# ============================================================
+# ORDERING STRATEGIES
+# ============================================================
+# Each strategy takes (index, metadata) and returns a list of positions
+# into the index. Positions are already sorted oldest-first by post ID,
+# so that order is the natural tie-breaker.
+
+def _metadata_at(index, metadata, position):
+    """Return the cached metadata for an index position (or an empty dict)."""
+    return metadata.get(key_to_post_id(index.keys[position])) or {}
+
+def order_oldest(index, metadata):
+    """Oldest to newest by post ID."""
+    return list(range(len(index)))
+
+def order_by_created(index, metadata):
+    """Oldest to newest by created_utc.
+    
+    Posts without cached metadata inherit the timestamp of the closest older
+    post that has one, since post IDs increase over time.
+    """
+    created = []
+    last_known = float('-inf')
+    for position in range(len(index)):
+        value = _metadata_at(index, metadata, position).get('created_utc')
+        if index.keys[position] != NO_ID and value is not None:
+            last_known = value
+        created.append(last_known if value is None else value)
+    return sorted(range(len(index)), key=created.__getitem__)
 
-def sort_posts_by_age(input_file, output_file):
-    """Sort posts from oldest to newest and save to a new file."""
+def order_subreddit_round_robin(index, metadata):
+    """Interleave subreddits so consecutive posts come from different ones."""
+    queues = {}
+    for position in range(len(index)):
+        subreddit = (
+            _metadata_at(index, metadata, position).get('subreddit')
+            or subreddit_from_url(index.url_at(position))
+            or ''
+        )
+        queues.setdefault(subreddit, []).append(position)
     
-    # Read the input file
-    with open(input_file, 'r', encoding='utf-8') as f:
-        content = f.read()
+    ordered = []
+    queues = [queue[::-1] for queue in queues.values()]
+    while queues:
+        for queue in queues:
+            ordered.append(queue.pop())
+        queues = [queue for queue in queues if queue]
+    return ordered
+
+def order_by_media_count(index, metadata):
+    """Single-media posts first, then 2, 3, 4+; unknown counts last."""
+    def bucket(position):
+        count = _metadata_at(index, metadata, position).get('media_count')
+        return 5 if count is None else min(count, 4)
+    return sorted(range(len(index)), key=bucket)
+
+def order_by_upload_cost(index, metadata):
+    """Cheap image posts first, with video posts spread out evenly.
     
-    # Fix common JSON errors (trailing commas)
-    content = re.sub(r',(\s*[}\]])', r'\1', content)
+    Video posts dominate upload time and X's per-hour limits, so they are
+    interleaved at a regular interval instead of arriving in clusters.
+    """
+    def cost(position):
+        meta = _metadata_at(index, metadata, position)
+        if 'est_bytes' in meta:
+            return meta['est_bytes']
+        return DEFAULT_IMAGE_BYTES
     
-    try:
-        data = json.loads(content)
-    except json.JSONDecodeError as e:
-        print(f"❌ JSON parsing error: {e}")
-        print("Attempting to fix common JSON issues...")
-        # Additional cleanup if needed
-        raise
+    images = []
+    videos = []
+    for position in range(len(index)):
+        if _metadata_at(index, metadata, position).get('video_count'):
+            videos.append(position)
+        else:
+            images.append(position)
+    images.sort(key=cost)
+    videos.sort(key=cost)
+    
+    # Bresenham-style merge: one video every len(total)/len(videos) slots
+    ordered = []
+    total = len(images) + len(videos)
+    placed_videos = 0
+    image_iter = iter(images)
+    for slot in range(total):
+        if placed_videos < len(videos) and (slot + 1) * len(videos) >= (placed_videos + 1) * total:
+            ordered.append(videos[placed_videos])
+            placed_videos += 1
+        else:
+            ordered.append(next(image_iter))
+    return ordered
+
+ORDERING_STRATEGIES = {
+    'oldest': order_oldest,
+    'created': order_by_created,
+    'subreddit': order_subreddit_round_robin,
+    'media': order_by_media_count,
+    'cost': order_by_upload_cost,
+}
+
+# ============================================================
+
+def sort_posts_by_age(input_file, output_file, order='oldest', dedup=False):
+    """Sort posts (oldest to newest by default) and save to a new file.
+    
+    Args:
+        input_file: Path to the saved posts JSON file
+        output_file: Path to write the sorted file to
+        order: Name of a strategy in ORDERING_STRATEGIES
+        dedup: Also drop duplicate posts (same post ID)
+    """
+    
+    # Read the input file, repairing trailing commas and truncated tails
+    data, repairs = load_json_tolerant(input_file)
+    if repairs:
+        print(f"🔧 Repaired {len(repairs)} JSON issue(s) in {input_file.name}:")
+        for repair in repairs[:10]:
+            print(f"   - {repair}")
+        if len(repairs) > 10:
+            print(f"   ... and {len(repairs) - 10} more")
     
     urls = data.get('urls', [])
     print(f"📖 Loaded {len(urls)} posts from {input_file.name}")
     
-    # Create list of (post_id, url) tuples for sorting
-    posts_with_ids = []
-    for url in urls:
-        post_id = extract_post_id(url)
-        if post_id:
-            # Reddit IDs are base-36, convert to integer for proper sorting
-            try:
-                id_as_int = int(post_id, 36)
-                posts_with_ids.append((id_as_int, url))
-            except ValueError:
-                # If conversion fails, keep the URL anyway
-                posts_with_ids.append((0, url))
-        else:
-            # No ID found, put at the beginning
-            posts_with_ids.append((0, url))
+    # Drop anything already in the posted archive
+    unposted = PostedScreen().drop_posted(urls)
+    if len(unposted) < len(urls):
+        print(f"🧹 Dropped {len(urls) - len(unposted)} already-posted URLs")
+    urls = unposted
     
-    # Sort by the integer ID (oldest first)
-    posts_with_ids.sort(key=lambda x: x[0])
+    # Reddit IDs are base-36; the index keys them as integers and sorts them
+    # (oldest first). URLs with no ID go at the beginning.
+    index = PostIndex.from_urls(urls, dedup=dedup)
+    if len(index) < len(urls):
+        print(f"🧹 Dropped {len(urls) - len(index)} duplicate posts")
     
-    # Extract just the URLs in sorted order
-    sorted_urls = [url for _, url in posts_with_ids]
+    if order == 'oldest':
+        sorted_urls = index.urls()
+    else:
+        metadata = load_metadata_cache()
+        print(f"🗂️  Using cached metadata for {len(metadata)} posts")
+        positions = ORDERING_STRATEGIES[order](index, metadata)
+        sorted_urls = [index.url_at(position) for position in positions]
+    sort_order = "oldest_to_newest" if order == 'oldest' else order
     
     # Create output data
     output_data = {
         "indexed_at": data.get("indexed_at", datetime.now().isoformat()),
         "sorted_at": datetime.now().isoformat(),
-        "sort_order": "oldest_to_newest",
+        "sort_order": sort_order,
         "count": len(sorted_urls),
         "urls": sorted_urls
     }
@@ -71,20 +176,27 @@ def sort_posts_by_age(input_file, output_file):
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(output_data, f, indent=2)
     
-    print(f"✅ Sorted {len(sorted_urls)} posts from oldest to newest")
+    print(f"✅ Sorted {len(sorted_urls)} posts ({sort_order})")
     print(f"💾 Saved to: {output_file}")
-    print(f"\n📋 First few posts (oldest):")
+    print(f"\n📋 First few posts:")
     for i, url in enumerate(sorted_urls[:5], 1):
         post_id = extract_post_id(url)
         print(f"  {i}. {url} (ID: {post_id})")
     
     if len(sorted_urls) > 5:
-        print(f"\n📋 Last few posts (newest):")
+        print(f"\n📋 Last few posts:")
         for i, url in enumerate(sorted_urls[-3:], len(sorted_urls) - 2):
             post_id = extract_post_id(url)
             print(f"  {i}. {url} (ID: {post_id})")
 
 def main():
+    parser = argparse.ArgumentParser(description="Sort Reddit saved posts")
+    parser.add_argument('--order', choices=sorted(ORDERING_STRATEGIES), default='oldest',
+                        help="Ordering strategy (default: oldest first by post ID)")
+    parser.add_argument('--dedup', action='store_true',
+                        help="Also drop duplicate posts (same post ID)")
+    args = parser.parse_args()
+    
     # Look for the input file
     input_file = Path.home() / "Downloads" / "reddit_saved_posts.json"
     
@@ -102,7 +214,7 @@ def main():
     output_file = Path.home() / "Downloads" / "saved_ordered_posts.json"
     
     try:
-        sort_posts_by_age(input_file, output_file)
+        sort_posts_by_age(input_file, output_file, order=args.order, dedup=args.dedup)
     except Exception as e:
         print(f"❌ Error: {e}")
         import traceback
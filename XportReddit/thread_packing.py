@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Packing downloaded media into the tweets of an X thread
+
+X allows up to 4 images per tweet, or exactly one video or GIF, and never a
+mix. The planner keeps the media in their original order, puts every
+video/GIF in its own tweet, and splits each run of images into the fewest
+tweets possible (ceil(n / 4)) with upload bytes spread as evenly as it can.
+
+It also estimates how long a thread takes to upload, for the upload waits
+and the auto-mode pacing.
+"""
+
+import math
+import os
+
+MAX_IMAGES_PER_TWEET = 4
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.webm', '.mkv', '.flv', '.gif')
+
+# Upload cost model (seconds); rough figures for a home connection
+UPLOAD_BYTES_PER_SECOND = 2_000_000
+VIDEO_PROCESSING_SECONDS = 10.0    # X's server-side processing per video/GIF
+SECONDS_PER_TWEET = 3.0            # Adding a tweet and attaching files
+
+
+def is_video(path):
+    """Check whether a file is uploaded as a video (X treats GIFs the same way)."""
+    return path.lower().endswith(VIDEO_EXTENSIONS)
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _balanced_split(sizes, parts, max_items):
+    """Split sizes into `parts` contiguous groups of at most max_items, minimising the largest group.
+
+    Returns:
+        list: Group lengths
+    """
+    n = len(sizes)
+    prefix = [0]
+    for size in sizes:
+        prefix.append(prefix[-1] + size)
+
+    # best[k][i]: smallest possible largest group when the first i items form k groups
+    inf = float('inf')
+    best = [[inf] * (n + 1) for _ in range(parts + 1)]
+    cut = [[0] * (n + 1) for _ in range(parts + 1)]
+    best[0][0] = 0
+    for k in range(1, parts + 1):
+        for i in range(1, n + 1):
+            for j in range(max(0, i - max_items), i):
+                cost = max(best[k - 1][j], prefix[i] - prefix[j])
+                if cost < best[k][i]:
+                    best[k][i] = cost
+                    cut[k][i] = j
+
+    lengths = []
+    i = n
+    for k in range(parts, 0, -1):
+        j = cut[k][i]
+        lengths.append(i - j)
+        i = j
+    return lengths[::-1]
+
+
+def plan_thread(paths, max_images=MAX_IMAGES_PER_TWEET):
+    """Pack media files into tweets.
+
+    Args:
+        paths: Media file paths in thread order
+        max_images: Images allowed per tweet
+
+    Returns:
+        list: Batches (lists of paths), one per tweet
+    """
+    batches = []
+    run = []
+
+    def flush_images():
+        if not run:
+            return
+        parts = math.ceil(len(run) / max_images)
+        start = 0
+        for length in _balanced_split([_file_size(p) for p in run], parts, max_images):
+            batches.append(run[start:start + length])
+            start += length
+        run.clear()
+
+    for path in paths:
+        if is_video(path):
+            flush_images()
+            batches.append([path])
+        else:
+            run.append(path)
+    flush_images()
+    return batches
+
+
+def estimate_upload_seconds(batch):
+    """Estimate how long one tweet's media takes to upload and process."""
+    seconds = sum(_file_size(p) for p in batch) / UPLOAD_BYTES_PER_SECOND
+    seconds += sum(VIDEO_PROCESSING_SECONDS for p in batch if is_video(p))
+    return seconds
+
+
+def estimate_thread_seconds(batches):
+    """Estimate the upload cost of a whole thread, in seconds."""
+    return sum(estimate_upload_seconds(batch) + SECONDS_PER_TWEET for batch in batches)
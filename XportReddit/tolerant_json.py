@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Streaming, self-repairing JSON loader for the XportReddit state files
+
+The saved posts files are sometimes hand-edited (trailing commas) or cut
+short by a crashed write. This loader tokenizes the file chunk by chunk and
+builds the Python objects directly, repairing as it goes:
+
+- trailing commas before ] or } are dropped
+- missing commas between values are assumed
+- a truncated tail (half-written string, dangling key, unclosed brackets)
+  is trimmed and the open containers are closed
+
+Strings are matched as whole tokens, so URLs containing ",]" are never
+touched. Raw control characters and bad escapes inside strings are
+accepted as-is. Every fix is reported with its character offset.
+
+Valid files (the common case) are parsed by json.load; the tolerant
+tokenizer only runs when that fails.
+"""
+
+import json
+import re
+from json.decoder import scanstring
+
+CHUNK_SIZE = 1 << 20  # Characters read per chunk
+LOOKAHEAD = 64        # Keep this many characters buffered past a token (e.g. "2." of "2.5")
+
+TOKEN_PATTERN = re.compile(r'''
+    \s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*")
+      | (?P<punct>[{}\[\]:,])
+      | (?P<number>-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?)
+      | (?P<literal>true|false|null)
+    )''', re.VERBOSE)
+
+LITERALS = {'true': True, 'false': False, 'null': None}
+
+
+class JSONRepairError(ValueError):
+    """Raised when a file is too damaged to recover any document."""
+
+
+def _tokens(f, chunk_size):
+    """Yield (kind, text, offset) tokens from a text file.
+
+    At end of file, a truncated string yields ('truncated', text, offset) and
+    any other unparseable character yields ('garbage', char, offset).
+    """
+    buf = ''
+    pos = 0
+    consumed = 0  # Characters dropped from the front of buf so far
+    eof = False
+
+    while True:
+        match = TOKEN_PATTERN.match(buf, pos)
+        # A token near the end of the buffer may continue in the next chunk
+        if not eof and (match is None or match.end() + LOOKAHEAD > len(buf)):
+            chunk = f.read(chunk_size)
+            if chunk:
+                consumed += pos
+                buf = buf[pos:] + chunk
+                pos = 0
+            else:
+                eof = True
+            continue
+
+        if match is None:
+            rest_start = pos
+            while rest_start < len(buf) and buf[rest_start].isspace():
+                rest_start += 1
+            if rest_start >= len(buf):
+                return
+            offset = consumed + rest_start
+            if buf[rest_start] == '"':
+                yield 'truncated', buf[rest_start:], offset
+                return
+            yield 'garbage', buf[rest_start], offset
+            pos = rest_start + 1
+            continue
+
+        kind = match.lastgroup
+        text = match.group(kind)
+        yield kind, text, consumed + match.start(kind)
+        pos = match.end()
+
+
+def _string(text):
+    """Decode a string token.
+
+    Returns:
+        tuple: (value, problem) where problem describes what had to be
+        tolerated, or None for a valid string
+    """
+    try:
+        return scanstring(text, 1)[0], None
+    except ValueError:
+        pass
+    try:
+        # Raw control characters (e.g. a literal tab or newline)
+        return scanstring(text, 1, False)[0], "control character in string"
+    except ValueError:
+        # Invalid escape sequence; keep the text between the quotes
+        return text[1:-1], "invalid escape in string"
+
+
+def _scalar(kind, text):
+    """Convert a literal or number token to its Python value."""
+    if kind == 'literal':
+        return LITERALS[text]
+    if '.' in text or 'e' in text or 'E' in text:
+        return float(text)
+    return int(text)
+
+
+class _Frame:
+    """An open array or object while parsing."""
+
+    __slots__ = ('container', 'expecting', 'key', 'comma_offset')
+
+    def __init__(self, container):
+        self.container = container
+        # Arrays: 'value' or 'comma'. Objects: 'key', 'colon', 'value' or 'comma'
+        self.expecting = 'value' if isinstance(container, list) else 'key'
+        self.key = None
+        self.comma_offset = None  # Offset of a comma not yet followed by a value
+
+
+def load_json_tolerant(json_file, chunk_size=CHUNK_SIZE):
+    """Load a JSON file, repairing common damage in a streaming pass if json.load fails.
+
+    Args:
+        json_file: Path to the JSON file
+        chunk_size: Characters to read per chunk
+
+    Returns:
+        tuple: (data, repairs) where repairs is a list of human-readable
+        descriptions of everything that was fixed (empty if the file was valid)
+
+    Raises:
+        JSONRepairError: If no JSON value could be recovered at all
+    """
+    try:
+        with open(json_file, 'r', encoding='utf-8') as f:
+            return json.load(f), []
+    except ValueError:
+        pass  # Damaged; repair below
+
+    repairs = []
+    roots = []
+    stack = []
+
+    def attach(value, offset):
+        """Attach a value to the innermost open container (or the root)."""
+        if not stack:
+            if roots:
+                repairs.append(f"ignored extra data at offset {offset}")
+            else:
+                roots.append(value)
+            return
+        frame = stack[-1]
+        if frame.expecting == 'comma':
+            repairs.append(f"inserted missing comma at offset {offset}")
+        if isinstance(frame.container, list):
+            frame.container.append(value)
+        elif frame.expecting in ('key', 'comma'):
+            # A value where a key belongs can't be placed; drop it
+            repairs.append(f"dropped value without a key at offset {offset}")
+        else:
+            if frame.expecting == 'colon':
+                repairs.append(f"inserted missing colon at offset {offset}")
+            frame.container[frame.key] = value
+            frame.key = None
+        frame.expecting = 'comma'
+        frame.comma_offset = None
+
+    with open(json_file, 'r', encoding='utf-8') as f:
+        for kind, text, offset in _tokens(f, chunk_size):
+            frame = stack[-1] if stack else None
+            in_object = frame is not None and isinstance(frame.container, dict)
+
+            if kind == 'garbage':
+                repairs.append(f"skipped unexpected {text!r} at offset {offset}")
+            elif kind == 'truncated':
+                what = 'key' if in_object and frame.expecting in ('key', 'comma') else 'string'
+                repairs.append(f"dropped truncated {what} at offset {offset}")
+                break
+            elif kind == 'string' and in_object and frame.expecting in ('key', 'comma'):
+                if frame.expecting == 'comma':
+                    repairs.append(f"inserted missing comma at offset {offset}")
+                frame.key, problem = _string(text)
+                if problem:
+                    repairs.append(f"kept {problem} at offset {offset}")
+                frame.expecting = 'colon'
+                frame.comma_offset = None
+            elif kind == 'string':
+                value, problem = _string(text)
+                if problem:
+                    repairs.append(f"kept {problem} at offset {offset}")
+                attach(value, offset)
+            elif kind != 'punct':
+                attach(_scalar(kind, text), offset)
+            elif text in '[{':
+                container = [] if text == '[' else {}
+                attach(container, offset)
+                # Pushed even if it couldn't be attached, so its contents are consumed
+                stack.append(_Frame(container))
+            elif text in ']}':
+                if frame is None:
+                    repairs.append(f"skipped unmatched {text!r} at offset {offset}")
+                    continue
+                if frame.comma_offset is not None:
+                    repairs.append(f"removed trailing comma at offset {frame.comma_offset}")
+                if in_object and frame.expecting in ('colon', 'value'):
+                    repairs.append(f"dropped key without a value at offset {offset}")
+                stack.pop()
+            elif text == ',':
+                if frame is not None and frame.expecting == 'comma':
+                    frame.expecting = 'key' if in_object else 'value'
+                    frame.comma_offset = offset
+                else:
+                    repairs.append(f"removed stray comma at offset {offset}")
+            elif text == ':':
+                if in_object and frame.expecting == 'colon':
+                    frame.expecting = 'value'
+                else:
+                    repairs.append(f"skipped stray colon at offset {offset}")
+
+    if stack:
+        frame = stack[-1]
+        if frame.comma_offset is not None:
+            repairs.append(f"removed trailing comma at offset {frame.comma_offset}")
+        if isinstance(frame.container, dict) and frame.expecting in ('colon', 'value'):
+            repairs.append("dropped key without a value at end of file")
+        repairs.append(f"closed {len(stack)} unterminated container(s) at end of file")
+
+    if not roots:
+        raise JSONRepairError(f"No JSON value could be recovered from {json_file}")
+
+    return roots[0], repairs
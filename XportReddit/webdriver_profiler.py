@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Opt-in WebDriver command profiler
+
+Every Selenium call (driver methods, WebElement methods, waits polling
+find_element) ends up in driver.execute(command, params), one HTTP
+round-trip to the browser driver each. The profiler wraps that method on a
+live driver instance and records, per command: its name, duration, request
+and response payload sizes, and the XportReddit helper that issued it.
+
+At the end of a run, report() lists the helpers and (helper, command)
+pairs that spent the most time, so the heaviest round-trip sources can be
+optimised first.
+"""
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+DEFAULT_TOP_N = 15
+SCRIPT_DIR = str(Path(__file__).parent)
+# Shared plumbing that every helper goes through; commands are credited to its caller instead
+INFRASTRUCTURE_MODULES = {'webdriver_profiler.py', 'selector_registry.py', 'post_metrics.py'}
+
+
+def _payload_size(value):
+    """Approximate JSON size of a command's params or response value."""
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value)
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _calling_helper():
+    """Name the innermost function in this folder's scripts that led to the command.
+
+    Frames in INFRASTRUCTURE_MODULES are skipped, so e.g. a registry lookup
+    is credited to the helper that asked for the element, not to the registry.
+    """
+    frame = sys._getframe(2)  # Skip _calling_helper and the execute wrapper
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (filename.startswith(SCRIPT_DIR)
+                and os.path.basename(filename) not in INFRASTRUCTURE_MODULES):
+            name = frame.f_code.co_name
+            return 'main loop' if name == '<module>' else name
+        frame = frame.f_back
+    return 'other'
+
+
+class _Totals:
+    __slots__ = ('calls', 'errors', 'seconds', 'sent', 'received')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.sent = 0
+        self.received = 0
+
+    def add(self, seconds, sent, received, failed=False):
+        self.calls += 1
+        self.errors += failed
+        self.seconds += seconds
+        self.sent += sent
+        self.received += received
+
+
+class WebDriverProfiler:
+    """Records every command sent through one WebDriver instance."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.by_helper = {}    # helper -> _Totals
+        self.by_pair = {}      # (helper, command) -> _Totals
+        self.by_command = {}   # command -> _Totals
+        self.total = _Totals()
+        self._original_execute = None
+
+    def install(self):
+        """Start profiling (wraps driver.execute on this instance only)."""
+        if self._original_execute is not None:
+            return self
+        self._original_execute = self.driver.execute
+        original = self._original_execute
+
+        def execute(driver_command, params=None):
+            started = time.perf_counter()
+            response = None
+            failed = True
+            try:
+                response = original(driver_command, params)
+                failed = False
+                return response
+            finally:
+                # Failed lookups (NoSuchElement, missed wait polls) count too
+                elapsed = time.perf_counter() - started
+                received = _payload_size(response.get('value')) if isinstance(response, dict) else 0
+                self._record(_calling_helper(), driver_command, elapsed,
+                             _payload_size(params), received, failed)
+
+        self.driver.execute = execute
+        return self
+
+    def uninstall(self):
+        """Stop profiling and restore the driver's own execute."""
+        if self._original_execute is not None:
+            # Drop the instance attribute so the class method is used again
+            del self.driver.execute
+            self._original_execute = None
+
+    def attach(self, driver):
+        """Move profiling to a new driver (e.g. after a browser restart), keeping the totals."""
+        self.uninstall()
+        self.driver = driver
+        return self.install()
+
+    def _record(self, helper, command, seconds, sent, received, failed=False):
+        for table, key in ((self.by_helper, helper), (self.by_pair, (helper, command)),
+                           (self.by_command, command)):
+            totals = table.get(key)
+            if totals is None:
+                totals = table[key] = _Totals()
+            totals.add(seconds, sent, received, failed)
+        self.total.add(seconds, sent, received, failed)
+
+    def report(self, top_n=DEFAULT_TOP_N):
+        """Return the top-N report as printable lines."""
+        if not self.total.calls:
+            return ["   No WebDriver commands recorded"]
+
+        def rows(table, label):
+            ranked = sorted(table.items(), key=lambda item: -item[1].seconds)[:top_n]
+            lines = [f"   {label:<52}{'calls':>7}{'errors':>8}{'total s':>10}{'avg ms':>9}{'KB in':>9}{'KB out':>9}"]
+            for key, t in ranked:
+                name = ' / '.join(key) if isinstance(key, tuple) else key
+                lines.append(f"   {name[:52]:<52}{t.calls:>7}{t.errors:>8}{t.seconds:>10.2f}"
+                             f"{t.seconds / t.calls * 1000:>9.1f}{t.received / 1024:>9.1f}{t.sent / 1024:>9.1f}")
+            return lines
+
+        lines = [f"   {self.total.calls} WebDriver round-trips ({self.total.errors} failed), "
+                 f"{self.total.seconds:.1f}s, {self.total.received / 1024:.0f} KB received"]
+        lines += [""] + rows(self.by_helper, "Helper")
+        lines += [""] + rows(self.by_pair, "Helper / command")
+        lines += [""] + rows(self.by_command, "Command")
+        return lines
+
+
+def profile_driver(driver):
+    """Wrap a driver and return its profiler."""
+    return WebDriverProfiler(driver).install()